@@ -0,0 +1,113 @@
+"""
+Concurrent read throughput of lib.db.aio against the synchronous sessions,
+run sequentially and from a thread pool of the same width.
+
+Each operation looks up one certification by id and fetches the listing
+page that follows a random title, the two calls an integration service
+makes most.
+
+Usage:
+    python -m benchmarks.aio bench.db
+    python -m benchmarks.aio bench.db --operations 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from lib.db import aio, models
+from lib.db.models import Certification, SessionLocal
+from lib.db.queries import certifications_listing, keyset_page
+from lib.db.generate import SUBJECTS
+from benchmarks.common import use_database
+
+
+def workload(count, max_id, seed=0):
+    """(certification id, page cursor) pairs for ``count`` operations."""
+    rng = random.Random(seed)
+    return [
+        (rng.randint(1, max_id), (f"{rng.choice(SUBJECTS)} Certificate {i}", 0))
+        for i in range(count)
+    ]
+
+
+def sync_operation(cert_id, cursor):
+    session = SessionLocal()
+    try:
+        session.get(Certification, cert_id)
+        stmt, sort_col, id_col = certifications_listing()
+        keyset_page(session, stmt, sort_col, id_col, after=cursor)
+    finally:
+        session.close()
+
+
+def run_sequential(operations):
+    for cert_id, cursor in operations:
+        sync_operation(cert_id, cursor)
+
+
+def run_threads(operations, concurrency):
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda op: sync_operation(*op), operations))
+
+
+async def run_async(operations, concurrency, sessions):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def operation(cert_id, cursor):
+        async with limit, sessions() as session:
+            await aio.get(session, Certification, cert_id)
+            await aio.certifications_page(session, after=cursor)
+
+    await asyncio.gather(*(operation(*op) for op in operations))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the async data layer.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    engine = use_database(args.db)
+    with engine.connect() as conn:
+        max_id = conn.execute(select(func.max(Certification.id))).scalar() or 1
+    operations = workload(args.operations, max_id)
+
+    settings = dict(models.STORAGE, path=engine.url.database)
+    async_engine = aio.create_async_storage_engine(
+        settings, pool_size=args.concurrency, max_overflow=0
+    )
+    sessions = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def run_in_loop(ops):
+        await run_async(ops, args.concurrency, sessions)
+        await async_engine.dispose()
+
+    # Warm the page cache so the first path timed is not penalised.
+    run_sequential(operations)
+    results = {
+        "sync, sequential": timed(run_sequential, operations),
+        f"sync, {args.concurrency} threads": timed(
+            run_threads, operations, args.concurrency
+        ),
+        f"async, {args.concurrency} tasks": timed(asyncio.run, run_in_loop(operations)),
+    }
+    print(f"{'path':<24}{'seconds':>10}{'ops/s':>12}")
+    for label, seconds in results.items():
+        print(f"{label:<24}{seconds:>10.3f}{len(operations) / seconds:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
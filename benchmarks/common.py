@@ -0,0 +1,146 @@
+"""Shared helpers for the benchmark scripts."""
+
+import builtins
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from sqlalchemy import event
+from lib.db import models
+from lib.db.storage import create_storage_engine
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# A result regresses when it is this much slower or larger than its baseline.
+DEFAULT_TOLERANCE = 0.5
+
+# Differences below these are measurement noise, whatever the ratio.
+NOISE = {"seconds": 0.005, "peak_kb": 64}
+
+
+def use_database(path, settings=None):
+    """
+    Point the CLI's sessions at ``path`` and return the engine. PRAGMAs come
+    from ``settings``, or the configured storage profile by default.
+    """
+    if not os.path.exists(path):
+        sys.exit(f"{path} not found; create it with python -m lib.db.generate")
+    settings = dict(settings or models.STORAGE, path=os.path.abspath(path))
+    engine = create_storage_engine(settings)
+    models.SessionLocal.configure(bind=engine)
+    return engine
+
+
+@contextmanager
+def count_queries(engine):
+    """Yield a one-item list holding the number of statements executed."""
+    counter = [0]
+
+    def before_cursor_execute(*args):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def scripted_input(answers):
+    """
+    Answer ``input()`` prompts from ``answers``, a list of (prompt substring,
+    reply) pairs; the first pair whose substring is in the prompt wins and
+    anything unmatched gets an empty reply.
+    """
+    original = builtins.input
+
+    def fake_input(prompt=""):
+        for fragment, reply in answers:
+            if fragment in prompt:
+                return reply() if callable(reply) else reply
+        return ""
+
+    builtins.input = fake_input
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+@contextmanager
+def quiet():
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def measure(engine, fn, repeat=3):
+    """
+    Run ``fn`` ``repeat`` times and return the best wall time, the query
+    count of one run and the peak traced memory of a separate run.
+    """
+    best = None
+    queries = 0
+    for _ in range(repeat):
+        with count_queries(engine) as counter, quiet():
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        queries = counter[0]
+
+    tracemalloc.start()
+    try:
+        with quiet():
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "queries": queries, "peak_kb": peak // 1024}
+
+
+def load_baselines(path=BASELINES_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(baselines, path=BASELINES_PATH):
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Describe how ``result`` is worse than ``baseline``; empty if it is not."""
+    problems = []
+    if result["queries"] > baseline["queries"]:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    for field, noise in NOISE.items():
+        limit = baseline[field] * (1 + tolerance)
+        if result[field] > limit and result[field] - baseline[field] > noise:
+            problems.append(f"{field} {baseline[field]:.3f} -> {result[field]:.3f}")
+    return problems
+
+
+def report(name, results, baselines, tolerance=DEFAULT_TOLERANCE):
+    """Print a results table against ``baselines``; returns True on regression."""
+    failed = False
+    print(f"{'benchmark':<32}{'seconds':>10}{'queries':>9}{'peak KiB':>10}  status")
+    for label, result in results.items():
+        baseline = baselines.get(name, {}).get(label)
+        problems = regressions(result, baseline, tolerance) if baseline else []
+        failed = failed or bool(problems)
+        status = (
+            "REGRESSED: " + ", ".join(problems)
+            if problems
+            else ("ok" if baseline else "no baseline")
+        )
+        print(
+            f"{label:<32}{result['seconds']:>10.4f}{result['queries']:>9}"
+            f"{result['peak_kb']:>10}  {status}"
+        )
+    return failed
@@ -0,0 +1,112 @@
+"""
+Memory and throughput of the read models in lib.db.records against
+hydrating ORM objects, over certifications with their course and
+institution names and status.
+
+Each path reads ``--rows`` certifications either held in a list, as a
+screen holds its rows, or streamed and discarded, as the reports do. Times
+come from untraced runs. Peak memory comes from a separate run under
+tracemalloc.
+
+Usage:
+    python -m benchmarks.records bench.db
+    python -m benchmarks.records bench.db --rows 1000000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import deque
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
+from lib.db.models import SessionLocal, Course, Certification
+from lib.db.queries import STREAM_BATCH, certifications_listing
+from lib.db.records import CertificationRecord, stream_records
+from benchmarks.common import use_database
+
+
+def orm_objects(session, limit, stream):
+    """Certification instances with course and institution loaded by the join."""
+    stmt = (
+        select(Certification)
+        .join(Certification.course)
+        .join(Course.institution)
+        .options(
+            contains_eager(Certification.course).contains_eager(Course.institution)
+        )
+        .order_by(Certification.id)
+        .limit(limit)
+    )
+    if stream:
+        stmt = stmt.execution_options(yield_per=STREAM_BATCH)
+    for cert in session.scalars(stmt):
+        # What a screen reads from each object.
+        cert.course.name, cert.course.institution.name, cert.status
+        yield cert
+
+
+def records(session, limit, stream):
+    stmt, _, _ = certifications_listing()
+    stmt = stmt.order_by(Certification.id).limit(limit)
+    if stream:
+        stmt = stmt.execution_options(yield_per=STREAM_BATCH)
+    return stream_records(session, stmt, CertificationRecord)
+
+
+PATHS = {"ORM objects": orm_objects, "records": records}
+MODES = {"held": list, "streamed": lambda items: deque(items, maxlen=0)}
+
+
+def run(path, mode, limit):
+    session = SessionLocal()
+    try:
+        MODES[mode](PATHS[path](session, limit, mode == "streamed"))
+    finally:
+        session.close()
+
+
+def best_seconds(path, mode, limit, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(path, mode, limit)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_bytes(path, mode, limit):
+    tracemalloc.start()
+    try:
+        run(path, mode, limit)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the read models.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    use_database(args.db)
+    print(
+        f"{'path':<14}{'mode':<10}{'seconds':>9}{'rows/s':>12}"
+        f"{'peak MiB':>10}{'B/row':>8}"
+    )
+    for mode in MODES:
+        for path in PATHS:
+            seconds = best_seconds(path, mode, args.rows, args.repeat)
+            peak = peak_bytes(path, mode, args.rows)
+            print(
+                f"{path:<14}{mode:<10}{seconds:>9.3f}{args.rows / seconds:>12,.0f}"
+                f"{peak / 2**20:>10.1f}{peak / args.rows:>8,.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
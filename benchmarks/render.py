@@ -0,0 +1,107 @@
+"""
+Rendering throughput in rows per second: one print() per row, as the
+screens used to do, against the buffered table writer in lib.render.
+
+Rows are read from a generated database into records, statuses included,
+up front so only formatting and terminal output are timed. By default output goes to a pseudo-terminal
+that a background thread drains, line-buffered as stdout is on a real
+terminal, so every print() costs a write system call and a tty round trip.
+
+Usage:
+    python -m benchmarks.render bench.db
+    python -m benchmarks.render bench.db --rows 50000 --output /dev/null
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from lib import cli
+from lib.db.queries import certifications_listing
+from lib.db.records import CertificationRecord, to_records
+from lib.render import table, write
+from benchmarks.common import use_database
+
+
+def print_rows(rows):
+    # The per-row format of the certification listing before lib.render.
+    for c in rows:
+        print(
+            f"[{c.id}] {c.title} | Level: {c.level or '-'} | Course: {c.course_name} | Inst: {c.institution_name}"
+        )
+        print(
+            f"     Issued: {c.issue_date or '-'} | Expires: {c.expiry_date or '—'} | Status: {c.status}"
+        )
+
+
+def buffered_rows(rows):
+    write(table(cli.CERTIFICATION_COLUMNS, rows))
+
+
+def _drain(fd):
+    try:
+        while os.read(fd, 65536):
+            pass
+    except OSError:
+        pass
+
+
+@contextmanager
+def pseudo_terminal():
+    """Yield the path of a pty whose output is read and discarded."""
+    master, slave = os.openpty()
+    reader = threading.Thread(target=_drain, args=(master,), daemon=True)
+    reader.start()
+    try:
+        yield os.ttyname(slave)
+    finally:
+        os.close(slave)
+        os.close(master)
+
+
+def rows_per_second(fn, rows, output, repeat):
+    best = None
+    for _ in range(repeat):
+        with open(output, "w", buffering=1) as out, redirect_stdout(out):
+            start = time.perf_counter()
+            fn(rows)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best if best else 0
+
+
+def compare(rows, output, repeat):
+    print(f"{'renderer':<12}{'rows/s':>14}")
+    for label, fn in [("print", print_rows), ("buffered", buffered_rows)]:
+        rate = rows_per_second(fn, rows, output, repeat)
+        print(f"{label:<12}{rate:>14,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark row rendering.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--output", help="file or tty rows are written to (default: a new pty)"
+    )
+    args = parser.parse_args(argv)
+
+    engine = use_database(args.db)
+    stmt, sort_col, id_col = certifications_listing()
+    with engine.connect() as conn:
+        result = conn.execute(stmt.order_by(sort_col, id_col).limit(args.rows))
+        rows = list(to_records(result, CertificationRecord))
+
+    if args.output:
+        compare(rows, args.output, args.repeat)
+    else:
+        with pseudo_terminal() as output:
+            compare(rows, output, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
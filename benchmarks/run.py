@@ -0,0 +1,149 @@
+"""
+Time the CLI's list, report and CRUD paths against a generated database,
+recording wall time, query count and peak memory, and compare them with
+stored baselines.
+
+Usage:
+    python -m lib.db.generate bench.db
+    python -m benchmarks.run bench.db --save      # record baselines
+    python -m benchmarks.run bench.db             # compare, exit 1 on regression
+    python -m benchmarks.run bench.db --snapshot  # read paths from memory
+"""
+
+import argparse
+import os
+import sys
+from sqlalchemy import func, select
+from lib import cli
+from lib.db import snapshot
+from lib.db.models import SessionLocal, Institution, Course, Certification
+from benchmarks.common import (
+    DEFAULT_TOLERANCE,
+    load_baselines,
+    measure,
+    report,
+    save_baselines,
+    scripted_input,
+    use_database,
+)
+
+
+def _max_id(model):
+    session = SessionLocal()
+    try:
+        return session.execute(select(func.max(model.id))).scalar()
+    finally:
+        session.close()
+
+
+def read_paths():
+    """Read-only paths, answering every pager and pause prompt with Enter."""
+    return {
+        "list_institutions": lambda: cli.list_institutions(pause=True),
+        "list_courses": lambda: cli.list_courses(pause=True),
+        "list_certifications": lambda: cli.list_certifications(pause=True),
+        "list_certifications (3 pages)": lambda: _with_answers(
+            [("[n]ext", _replies(["n", "n", ""]))],
+            lambda: cli.list_certifications(pause=True),
+        ),
+        "report_certs_by_institution": cli.report_certs_by_institution,
+        "report_expiry_overview": cli.report_expiry_overview,
+        "report_status_summary": cli.report_status_summary,
+        "search (common word)": lambda: _with_answers(
+            [("Search", "data")], cli.search_records
+        ),
+        "search (selective)": lambda: _with_answers(
+            [("Search", "institution 0042")], cli.search_records
+        ),
+    }
+
+
+def _replies(values):
+    values = iter(values)
+    return lambda: next(values, "")
+
+
+def _with_answers(answers, fn):
+    with scripted_input(answers):
+        fn()
+
+
+def crud_cycle():
+    """
+    Add an institution, a course and a certification, edit and delete them
+    again, leaving the dataset as it was.
+    """
+    _with_answers(
+        [("Name: ", "Bench Institute"), ("Year", "2020")], cli.add_institution
+    )
+    inst_id = str(_max_id(Institution))
+    _with_answers(
+        [("Institution ID", inst_id), ("Course name", "Bench Course")],
+        cli.add_course,
+    )
+    course_id = str(_max_id(Course))
+    _with_answers(
+        [
+            ("Course ID", course_id),
+            ("Title", "Bench Certificate"),
+            ("Expiry date", "2030-01-01"),
+        ],
+        cli.add_certification,
+    )
+    cert_id = str(_max_id(Certification))
+    _with_answers(
+        [("Certification ID", cert_id), ("Level", "Expert")],
+        cli.update_certification,
+    )
+    _with_answers(
+        [("Institution ID", inst_id), ("Location", "Nairobi")],
+        cli.update_institution,
+    )
+    _with_answers(
+        [("Certification ID", cert_id), ("[y/N]", "y")], cli.delete_certification
+    )
+    _with_answers([("Course ID", course_id), ("[y/N]", "y")], cli.delete_course)
+    _with_answers([("Institution ID", inst_id), ("[y/N]", "y")], cli.delete_institution)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CLI paths.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--name", help="baseline key (defaults to the file name)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="run the read paths against an in-memory snapshot (no CRUD)",
+    )
+    args = parser.parse_args(argv)
+
+    engine = use_database(args.db)
+    name = args.name or os.path.basename(args.db)
+    paths = read_paths()
+    if args.snapshot:
+        snapshot.take()
+        engine = snapshot.engine()
+        name += " (snapshot)"
+    else:
+        paths["crud cycle"] = crud_cycle
+
+    results = {}
+    for label, fn in paths.items():
+        with scripted_input([]):
+            results[label] = measure(engine, fn, args.repeat)
+
+    baselines = load_baselines()
+    failed = report(name, results, baselines, args.tolerance)
+    if args.save:
+        baselines[name] = results
+        save_baselines(baselines)
+        print(f"Saved baselines for {name}.")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Scaling of the parallel expiry sweep (lib.scan) with the number of worker
+processes. Each run writes the full sweep to /dev/null; speedup and
+efficiency are relative to one worker, which always runs first.
+
+Usage:
+    python -m benchmarks.scan bench.db
+    python -m benchmarks.scan bench.db --workers 1 2 4 8 --days 3650
+"""
+
+import argparse
+import os
+import sys
+import time
+from lib.db.constants import EXPIRING_SOON_DAYS
+from lib.scan import scan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parallel scan.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--days", type=int, default=EXPIRING_SOON_DAYS)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; create it with python -m lib.db.generate")
+
+    cpus = os.cpu_count() or 1
+    counts = args.workers or [2, 4, cpus]
+    counts = [1] + sorted(set(counts) - {1})
+    print(f"{cpus} CPUs")
+    print(
+        f"{'workers':>8}{'seconds':>10}{'rows/s':>12}{'speedup':>9}{'efficiency':>12}"
+    )
+    serial = None
+    for workers in counts:
+        with open(os.devnull, "w") as out:
+            start = time.perf_counter()
+            rows = scan(args.db, out, args.days, workers=workers)
+            elapsed = time.perf_counter() - start
+        serial = serial or elapsed
+        speedup = serial / elapsed
+        print(
+            f"{workers:>8}{elapsed:>10.2f}{rows / elapsed:>12,.0f}"
+            f"{speedup:>9.2f}{speedup / workers:>12.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Measure import time and cold start of the command-line entry points in
+fresh interpreters, and fail when one exceeds its startup budget.
+
+Budgets are milliseconds on top of a bare ``python -c pass``, so they
+hold across machines of different speed.
+
+Usage:
+    python -m benchmarks.startup bench.db
+    python -m benchmarks.startup bench.db --runs 20 --budget-scale 1.5
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# label -> (interpreter arguments, budget in ms above the bare interpreter)
+CASES = {
+    # Argument parsing alone must not load SQLAlchemy.
+    "import lib.commands": (["-c", "import lib.commands"], 50),
+    "main.py --help": (["main.py", "--help"], 80),
+    # SQLAlchemy's ORM is most of these.
+    "import lib.db.models": (["-c", "import lib.db.models"], 900),
+    "import lib.cli": (["-c", "import lib.cli"], 1000),
+    "main.py summary": (["main.py", "summary"], 1000),
+    "main.py summary (new schema)": (["main.py", "summary"], 1100),
+}
+
+# Reset before every run of the matching case so init_db() does a full check.
+RESET_SCHEMA = {"main.py summary (new schema)"}
+
+
+def cold_start(args, env, runs, before=None):
+    """Best wall time in ms of ``python args`` over ``runs`` fresh processes."""
+    best = None
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget-scale", type=float, default=1.0, help="multiply every budget"
+    )
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; create it with python -m lib.db.generate")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        shutil.copyfile(args.db, path)
+        env = dict(os.environ, TRACKER_DB_PATH=path)
+
+        def reset_schema():
+            with sqlite3.connect(path) as conn:
+                conn.execute("PRAGMA user_version = 0")
+
+        # Compile bytecode first so no case pays for it.
+        cold_start(["-c", "import lib.cli, lib.commands"], env, 1)
+        floor = cold_start(["-c", "pass"], env, args.runs)
+        print(f"bare interpreter: {floor:.1f} ms")
+        print(f"{'case':<32}{'ms':>9}{'budget':>9}  status")
+        failed = False
+        for label, (case_args, budget) in CASES.items():
+            before = reset_schema if label in RESET_SCHEMA else None
+            elapsed = cold_start(case_args, env, args.runs, before) - floor
+            budget *= args.budget_scale
+            over = elapsed > budget
+            failed = failed or over
+            status = "OVER BUDGET" if over else "ok"
+            print(f"{label:<32}{elapsed:>9.1f}{budget:>9.0f}  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
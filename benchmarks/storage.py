@@ -0,0 +1,94 @@
+"""
+Compare storage profiles on a copy of a generated database: latency of
+single-row commits and throughput of a full joined scan.
+
+Usage:
+    python -m benchmarks.storage bench.db
+    python -m benchmarks.storage bench.db --profiles default wal --commits 500
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from sqlalchemy.orm import sessionmaker
+from lib.db.models import Certification
+from lib.db.queries import certifications_export
+from lib.db.storage import PROFILES, create_storage_engine
+
+
+def commit_latencies(engine, commits):
+    """Milliseconds per add-and-commit of one certification, like the CLI."""
+    Session = sessionmaker(bind=engine, future=True)
+    session = Session()
+    latencies = []
+    try:
+        for i in range(commits):
+            start = time.perf_counter()
+            session.add(Certification(course_id=1, title=f"Storage bench {i}"))
+            session.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        session.close()
+    return latencies
+
+
+def scan_rate(engine):
+    """Rows per second for a full export scan, after one warm-up pass."""
+    stmt = certifications_export()
+    rate = 0
+    for _ in range(2):
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            rows = sum(1 for _ in conn.execute(stmt))
+            elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+    return rate
+
+
+def bench_profile(source, profile, commits):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        shutil.copyfile(source, path)
+        engine = create_storage_engine(dict(PROFILES[profile], path=path))
+        try:
+            latencies = commit_latencies(engine, commits)
+            rate = scan_rate(engine)
+        finally:
+            engine.dispose()
+    latencies.sort()
+    return {
+        "commit_median_ms": statistics.median(latencies),
+        "commit_p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "scan_rows_per_s": rate,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark storage profiles.")
+    parser.add_argument("db", help="generated database (python -m lib.db.generate)")
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES)
+    )
+    parser.add_argument("--commits", type=int, default=200)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; create it with python -m lib.db.generate")
+
+    print(
+        f"{'profile':<10}{'commit median ms':>18}{'commit p95 ms':>15}{'scan rows/s':>14}"
+    )
+    for profile in args.profiles:
+        result = bench_profile(args.db, profile, args.commits)
+        print(
+            f"{profile:<10}{result['commit_median_ms']:>18.3f}"
+            f"{result['commit_p95_ms']:>15.3f}{result['scan_rows_per_s']:>14,.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
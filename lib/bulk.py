@@ -0,0 +1,164 @@
+"""
+Bulk renew, extend and re-level: change every certification matching a
+filter with one set-based UPDATE in one transaction.
+
+Without ``--apply`` only the number of matching certifications is shown.
+The expiry summary is adjusted from grouped counts of the old and new
+expiry dates, read in the same transaction, not row by row.
+
+Periods are a signed number of days, months or years (``30d``, ``6m``,
+``1y``, ``-1y``) and use SQLite date arithmetic, so a month added to
+January 31 gives March 2 or 3. Certifications without an expiry date keep
+none.
+
+Usage:
+    python -m lib.bulk --institution "Northwind University" --extend 1y
+    python -m lib.bulk --institution "Northwind University" --extend 1y --apply
+    python -m lib.bulk --level Associate --set-level Foundation --apply
+    python -m lib.bulk --status expired --course "Data Science" \\
+        --set-issue 2026-10-18 --extend 2y --apply
+"""
+
+import argparse
+import re
+import sys
+import time
+from sqlalchemy import Date, func, literal, select, update
+from lib.db.constants import STATUS_SLUGS
+from lib.db.models import SessionLocal, init_db, Certification
+from lib.db.queries import certification_filter
+from lib.db.summary import adjust_grouped, expiry_histogram
+from lib.helpers import date_arg
+
+PERIOD = re.compile(r"([+-]?)(\d+)([dmy])")
+PERIOD_UNITS = {"d": "days", "m": "months", "y": "years"}
+
+
+def parse_period(text):
+    """SQLite date modifier for a period like ``1y``, ``-6m`` or ``+30d``."""
+    match = PERIOD.fullmatch(text.strip().lower())
+    if not match:
+        raise ValueError(f"expected a period like 30d, 6m or 1y, got {text!r}")
+    sign, amount, unit = match.groups()
+    return f"{sign or '+'}{amount} {PERIOD_UNITS[unit]}"
+
+
+def period_arg(value):
+    """argparse type for ``parse_period``."""
+    try:
+        return parse_period(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def bulk_values(extend=None, set_expiry=None, set_issue=None, set_level=None):
+    """
+    Column values for ``bulk_update``. ``extend`` is a modifier from
+    ``parse_period`` and shifts the current expiry date.
+    """
+    values = {}
+    if extend is not None:
+        values["expiry_date"] = func.date(Certification.expiry_date, extend, type_=Date)
+    elif set_expiry is not None:
+        values["expiry_date"] = literal(set_expiry, Date)
+    if set_issue is not None:
+        values["issue_date"] = set_issue
+    if set_level is not None:
+        values["level"] = set_level
+        values["fingerprint"] = func.fingerprint(Certification.title, set_level)
+    return values
+
+
+def count_matching(session, criteria):
+    return session.execute(
+        select(func.count()).select_from(Certification).where(*criteria)
+    ).scalar()
+
+
+def bulk_update(session, criteria, values):
+    """
+    Apply ``values`` to every certification matching ``criteria`` in one
+    UPDATE and commit. Returns the number of rows changed.
+    """
+    try:
+        expiry = values.get("expiry_date")
+        if expiry is not None:
+            removed = session.execute(expiry_histogram(*criteria)).all()
+            added = session.execute(expiry_histogram(*criteria, expiry=expiry)).all()
+        result = session.execute(
+            update(Certification).where(*criteria).values(values),
+            execution_options={"synchronize_session": False},
+        )
+        if expiry is not None:
+            # The UPDATE bypasses the ORM listeners, so move the counts here.
+            adjust_grouped(session.connection(), added=added, removed=removed)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return result.rowcount
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Renew, extend or re-level many certifications at once."
+    )
+    picks = parser.add_argument_group("filter")
+    picks.add_argument("--institution", help="institution name")
+    picks.add_argument("--course", help="course name")
+    picks.add_argument("--level", help="current level")
+    picks.add_argument("--status", choices=sorted(STATUS_SLUGS))
+    picks.add_argument("--expires-from", type=date_arg, metavar="YYYY-MM-DD")
+    picks.add_argument("--expires-to", type=date_arg, metavar="YYYY-MM-DD")
+
+    changes = parser.add_argument_group("changes")
+    expiry = changes.add_mutually_exclusive_group()
+    expiry.add_argument(
+        "--extend", type=period_arg, metavar="PERIOD", help="shift expiry, e.g. 1y"
+    )
+    expiry.add_argument("--set-expiry", type=date_arg, metavar="YYYY-MM-DD")
+    changes.add_argument("--set-issue", type=date_arg, metavar="YYYY-MM-DD")
+    changes.add_argument("--set-level", metavar="LEVEL")
+    parser.add_argument(
+        "--apply", action="store_true", help="make the change (default: dry run)"
+    )
+    args = parser.parse_args(argv)
+
+    values = bulk_values(args.extend, args.set_expiry, args.set_issue, args.set_level)
+    if not values:
+        parser.error(
+            "nothing to change: give --extend, --set-expiry, --set-issue or --set-level"
+        )
+    criteria = certification_filter(
+        institution=args.institution,
+        course=args.course,
+        level=args.level,
+        status=STATUS_SLUGS.get(args.status),
+        expires_from=args.expires_from,
+        expires_to=args.expires_to,
+    )
+
+    init_db()
+    session = SessionLocal()
+    try:
+        start = time.perf_counter()
+        matched = count_matching(session, criteria)
+        elapsed = time.perf_counter() - start
+        print(f"Matched {matched} certifications in {elapsed:.3f}s")
+        if not args.apply:
+            print("Dry run: nothing changed. Re-run with --apply to update them.")
+            return 0
+        start = time.perf_counter()
+        changed = bulk_update(session, criteria, values)
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    print(
+        f"Updated {changed} certifications in {elapsed:.3f}s "
+        f"({changed / elapsed if elapsed else 0:,.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
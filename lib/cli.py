@@ -1,5 +1,42 @@
+import functools
 import sys
-from lib.db.models import SessionLocal, init_db, Institution, Course, Certification
+import time
+from datetime import datetime
+from itertools import chain
+from operator import attrgetter
+from lib.db.models import (
+    EXPIRING_SOON_DAYS,
+    SessionLocal,
+    init_db,
+    Institution,
+    Course,
+    Certification,
+)
+from lib.bulk import bulk_update, bulk_values, count_matching, parse_period
+from lib.dedupe import matching_certification
+from lib.db.queries import (
+    PAGE_SIZE,
+    certification_filter,
+    certifications_by_institution,
+    certifications_listing,
+    courses_listing,
+    expiring_listing,
+    institutions_listing,
+    prefix_matches,
+    status_rollup,
+)
+from lib.db import snapshot
+from lib.db.records import (
+    CertificationRecord,
+    CourseRecord,
+    InstitutionRecord,
+    InstitutionReportRecord,
+    StatusRecord,
+    records_page,
+    stream_records,
+)
+from lib.db.search import hit_context, search
+from lib.db.summary import read_summary
 from lib.helpers import (
     clear_screen,
     prompt_int,
@@ -7,22 +44,35 @@ from lib.helpers import (
     prompt_date,
     confirm,
     divider,
+    divider_text,
+    format_age,
 )
+from lib.profiling import profiled
+from lib.render import Column, show, table, write
 
 
 # ---------------------- Entrypoint ----------------------
-def run_cli():
+def run_cli(use_snapshot=False):
     init_db()
+    if use_snapshot:
+        snapshot.take()
     while True:
         clear_screen()
         print("===========================================")
         print("  Course & Certification Tracker (Basic)")
         print("===========================================")
+        print(expiry_dashboard())
+        if snapshot.active():
+            print(snapshot_status())
+        print("-------------------------------------------")
         print("1. Manage Institutions")
         print("2. Manage Courses")
         print("3. Manage Certifications")
         print("4. View Reports")
-        print("5. Exit")
+        print("5. Search")
+        print("6. Exit")
+        if snapshot.active():
+            print("R. Refresh Snapshot")
         print("-------------------------------------------")
         choice = input("Select an option: ").strip()
 
@@ -35,12 +85,156 @@ def run_cli():
         elif choice == "4":
             reports_menu()
         elif choice == "5":
+            search_records()
+        elif choice == "6":
             print("\nThanks for using the tracker. Goodbye! 👋")
             sys.exit(0)
+        elif choice.lower() == "r" and snapshot.active():
+            refresh_snapshot()
         else:
             input("\nInvalid choice. Press Enter to try again...")
 
 
+# ---------------------- Snapshot ----------------------
+def snapshot_status():
+    taken = datetime.fromtimestamp(snapshot.taken_at())
+    return (
+        f"Read-only snapshot of {taken:%Y-%m-%d %H:%M:%S} "
+        f"({format_age(snapshot.age())} old)"
+    )
+
+
+@profiled
+def refresh_snapshot():
+    start = time.perf_counter()
+    snapshot.refresh()
+    print(f"\nSnapshot refreshed in {time.perf_counter() - start:.2f}s.")
+    input("\nPress Enter to continue...")
+
+
+def writes(fn):
+    """Refuse ``fn``, a menu action that changes data, in snapshot mode."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if snapshot.active():
+            print("\nThis is a read-only snapshot session; changes are refused.")
+            input("\nPress Enter to continue...")
+            return None
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@profiled
+def expiry_dashboard():
+    """One-line live totals, read from the maintained expiry summary."""
+    session = SessionLocal()
+    try:
+        counts = read_summary(session)
+    finally:
+        session.close()
+    return (
+        f"Expired today: {counts['expired_today']} | "
+        f"This week: {counts['this_week']} | "
+        f"≤{EXPIRING_SOON_DAYS} days: {counts['this_week'] + counts['soon']} | "
+        f"Expired: {counts['expired']}"
+    )
+
+
+# ---------------------- Paging ----------------------
+def browse(title, listing, record_type, columns, empty_message, page_size=PAGE_SIZE):
+    """
+    Show a listing one keyset page at a time, as a table of ``columns`` over
+    ``record_type`` records, with next/prev navigation. Returns True if the
+    user was prompted to navigate.
+    """
+    session = SessionLocal()
+    prompted = False
+    try:
+        page = records_page(session, listing, record_type, page_size)
+        while True:
+            if page.rows:
+                body = table(columns, page.rows)
+            else:
+                body = [empty_message]
+            write(chain([divider_text(title)], body))
+
+            options = []
+            if page.has_prev:
+                options.append("[p]rev")
+            if page.has_next:
+                options.append("[n]ext")
+            if not options:
+                return prompted
+            prompted = True
+            choice = input(f"\n{' / '.join(options)} / Enter to stop: ").strip().lower()
+            if choice == "n" and page.has_next:
+                page = records_page(
+                    session, listing, record_type, page_size, after=page.last
+                )
+            elif choice == "p" and page.has_prev:
+                page = records_page(
+                    session, listing, record_type, page_size, before=page.first
+                )
+            elif choice == "":
+                return prompted
+    finally:
+        session.close()
+
+
+# ---------------------- Picking ----------------------
+PICKER_LIMIT = 10
+
+# model -> (search index kind, name column)
+PICKABLE = {
+    Institution: ("institution", Institution.name),
+    Course: ("course", Course.name),
+    Certification: ("certification", Certification.title),
+}
+
+
+def pick_record(session, model):
+    """
+    Ask for an ID or a name. An ID is fetched directly; a name is matched
+    by prefix on the name index, topped up with case-insensitive word-prefix
+    matches from the search index, and at most PICKER_LIMIT are shown.
+    """
+    kind, name_col = PICKABLE[model]
+    label = model.__name__
+    answer = prompt_non_empty(f"\n{label} ID or name: ")
+    if answer.isdigit():
+        record = session.get(model, int(answer))
+        if not record:
+            print(f"Invalid {label} ID.")
+        return record
+
+    rows = session.execute(
+        prefix_matches(name_col, model.id, answer, PICKER_LIMIT)
+    ).all()
+    hits = [(kind, ref_id, name) for ref_id, name in rows]
+    if len(hits) < PICKER_LIMIT:
+        seen = {ref_id for _, ref_id, _ in hits}
+        for hit in search(session, answer, PICKER_LIMIT, kind=kind):
+            if hit[1] not in seen and len(hits) < PICKER_LIMIT:
+                hits.append(tuple(hit))
+    if not hits:
+        print(f"No {label.lower()} matches '{answer}'.")
+        return None
+
+    context = hit_context(session, hits)
+    divider(f"Matching {label}s")
+    for _, ref_id, name in hits:
+        print(f"[{ref_id}] {name} | {context.get((kind, ref_id), '')}")
+    if len(hits) == 1:
+        return session.get(model, hits[0][1])
+    record_id = prompt_int(f"\nEnter {label} ID: ")
+    record = session.get(model, record_id)
+    if not record:
+        print(f"Invalid {label} ID.")
+    return record
+
+
 # ---------------------- Institutions ----------------------
 def institutions_menu():
     while True:
@@ -67,6 +261,8 @@ def institutions_menu():
             input("\nInvalid choice. Press Enter to try again...")
 
 
+@writes
+@profiled
 def add_institution():
     clear_screen()
     print("Add Institution")
@@ -89,32 +285,35 @@ def add_institution():
         input("\nPress Enter to continue...")
 
 
-def list_institutions(pause=False):
-    session = SessionLocal()
-    rows = session.query(Institution).order_by(Institution.name.asc()).all()
-    divider("Institutions")
-    if not rows:
-        print("No institutions found.")
-    else:
-        for r in rows:
-            print(
-                f"[{r.id}] {r.name} | {r.location or 'N/A'} | Year: {r.year or '-'} | Type: {r.type or '-'}"
-            )
-    session.close()
-    if pause:
+INSTITUTION_COLUMNS = [
+    Column("ID", attrgetter("id"), ">"),
+    Column("Name", attrgetter("name")),
+    Column("Location", attrgetter("location")),
+    Column("Year", attrgetter("year"), ">"),
+    Column("Type", attrgetter("type")),
+]
+
+
+@profiled
+def list_institutions(pause=False, page_size=PAGE_SIZE):
+    browsed = browse(
+        "Institutions",
+        institutions_listing(),
+        InstitutionRecord,
+        INSTITUTION_COLUMNS,
+        "No institutions found.",
+        page_size,
+    )
+    if pause and not browsed:
         input("\nPress Enter to continue...")
 
 
 def choose_institution(session):
-    list_institutions()
-    inst_id = prompt_int("\nEnter Institution ID: ")
-    inst = session.get(Institution, inst_id)
-    if not inst:
-        print("Invalid Institution ID.")
-        return None
-    return inst
+    return pick_record(session, Institution)
 
 
+@writes
+@profiled
 def update_institution():
     clear_screen()
     session = SessionLocal()
@@ -149,6 +348,8 @@ def update_institution():
         input("\nPress Enter to continue...")
 
 
+@writes
+@profiled
 def delete_institution():
     clear_screen()
     session = SessionLocal()
@@ -200,33 +401,31 @@ def courses_menu():
             input("\nInvalid choice. Press Enter to try again...")
 
 
-def list_courses(pause=False):
-    session = SessionLocal()
-    institutions = session.query(Institution).order_by(Institution.name).all()
-    if not institutions:
-        print("\nNo institutions yet.")
-        session.close()
-        if pause:
-            input("\nPress Enter to continue...")
-        return
-
-    for inst in institutions:
-        divider(f"{inst.name} ({inst.location or 'N/A'})")
-        if not inst.courses:
-            print("  (no courses)")
-        else:
-            for c in inst.courses:
-                course_tuple = (c.id, c.name, c.duration or "-")
-                print(
-                    f"  [{course_tuple[0]}] {course_tuple[1]} | Duration: {course_tuple[2]}"
-                )
-                if c.description:
-                    print(f"     - {c.description}")
-    session.close()
-    if pause:
+COURSE_COLUMNS = [
+    Column("ID", attrgetter("id"), ">"),
+    Column("Name", attrgetter("name")),
+    Column("Institution", attrgetter("institution_name")),
+    Column("Duration", attrgetter("duration")),
+    Column("Description", attrgetter("description")),
+]
+
+
+@profiled
+def list_courses(pause=False, page_size=PAGE_SIZE):
+    browsed = browse(
+        "Courses",
+        courses_listing(),
+        CourseRecord,
+        COURSE_COLUMNS,
+        "No courses found.",
+        page_size,
+    )
+    if pause and not browsed:
         input("\nPress Enter to continue...")
 
 
+@writes
+@profiled
 def add_course():
     clear_screen()
     session = SessionLocal()
@@ -255,15 +454,11 @@ def add_course():
 
 
 def choose_course(session):
-    list_courses()
-    cid = prompt_int("\nEnter Course ID: ")
-    c = session.get(Course, cid)
-    if not c:
-        print("Invalid Course ID.")
-        return None
-    return c
+    return pick_record(session, Course)
 
 
+@writes
+@profiled
 def update_course():
     clear_screen()
     session = SessionLocal()
@@ -291,6 +486,8 @@ def update_course():
         input("\nPress Enter to continue...")
 
 
+@writes
+@profiled
 def delete_course():
     clear_screen()
     session = SessionLocal()
@@ -322,7 +519,8 @@ def certifications_menu():
         print("2. List Certifications")
         print("3. Update Certification")
         print("4. Delete Certification")
-        print("5. Back to Main Menu")
+        print("5. Bulk Update Certifications")
+        print("6. Back to Main Menu")
         choice = input("Select an option: ").strip()
 
         if choice == "1":
@@ -334,37 +532,41 @@ def certifications_menu():
         elif choice == "4":
             delete_certification()
         elif choice == "5":
+            bulk_update_certifications()
+        elif choice == "6":
             break
         else:
             input("\nInvalid choice. Press Enter to try again...")
 
 
-def list_certifications(pause=False):
-    session = SessionLocal()
-    certs = (
-        session.query(Certification)
-        .join(Course)
-        .join(Institution)
-        .order_by(Institution.name, Course.name, Certification.title)
-        .all()
+CERTIFICATION_COLUMNS = [
+    Column("ID", attrgetter("id"), ">"),
+    Column("Title", attrgetter("title")),
+    Column("Level", attrgetter("level")),
+    Column("Course", attrgetter("course_name")),
+    Column("Institution", attrgetter("institution_name")),
+    Column("Issued", attrgetter("issue_date")),
+    Column("Expires", attrgetter("expiry_date")),
+    Column("Status", attrgetter("status")),
+]
+
+
+@profiled
+def list_certifications(pause=False, page_size=PAGE_SIZE):
+    browsed = browse(
+        "Certifications",
+        certifications_listing(),
+        CertificationRecord,
+        CERTIFICATION_COLUMNS,
+        "No certifications found.",
+        page_size,
     )
-    divider("Certifications")
-    if not certs:
-        print("No certifications found.")
-    else:
-        for c in certs:
-            inst = c.course.institution
-            print(
-                f"[{c.id}] {c.title} | Level: {c.level or '-'} | Course: {c.course.name} | Inst: {inst.name}"
-            )
-            print(
-                f"     Issued: {c.issue_date or '-'} | Expires: {c.expiry_date or '—'} | Status: {c.status}"
-            )
-    session.close()
-    if pause:
+    if pause and not browsed:
         input("\nPress Enter to continue...")
 
 
+@writes
+@profiled
 def add_certification():
     clear_screen()
     session = SessionLocal()
@@ -376,6 +578,13 @@ def add_certification():
         print(f"\nAdding certification under course: {c.name}")
         title = prompt_non_empty("Title: ")
         level = input("Level (optional): ").strip() or None
+        duplicate = matching_certification(session, c.id, title, level)
+        if duplicate is not None and not confirm(
+            f"Certification [{duplicate}] in this course has the same title and "
+            "level. Add anyway? [y/N]: "
+        ):
+            print("\nNot added.")
+            return
         issue = prompt_date(
             "Issue date (YYYY-MM-DD, blank to skip): ", allow_blank=True
         )
@@ -402,15 +611,11 @@ def add_certification():
 
 
 def choose_certification(session):
-    list_certifications()
-    cid = prompt_int("\nEnter Certification ID: ")
-    cert = session.get(Certification, cid)
-    if not cert:
-        print("Invalid Certification ID.")
-        return None
-    return cert
+    return pick_record(session, Certification)
 
 
+@writes
+@profiled
 def update_certification():
     clear_screen()
     session = SessionLocal()
@@ -427,12 +632,8 @@ def update_certification():
         expiry_in = input(f"Expiry date [{cert.expiry_date or ''}]: ").strip()
 
         if issue_in:
-            from datetime import datetime
-
             cert.issue_date = datetime.strptime(issue_in, "%Y-%m-%d").date()
         if expiry_in:
-            from datetime import datetime
-
             cert.expiry_date = datetime.strptime(expiry_in, "%Y-%m-%d").date()
         if expiry_in == "":
             cert.expiry_date = None
@@ -448,6 +649,8 @@ def update_certification():
         input("\nPress Enter to continue...")
 
 
+@writes
+@profiled
 def delete_certification():
     clear_screen()
     session = SessionLocal()
@@ -470,85 +673,221 @@ def delete_certification():
         input("\nPress Enter to continue...")
 
 
+def prompt_period(prompt_text):
+    """Prompt for a period like 1y, 6m or -30d; None if blank."""
+    while True:
+        val = input(prompt_text).strip()
+        if val == "":
+            return None
+        try:
+            return parse_period(val)
+        except ValueError as e:
+            print(f"{e}.")
+
+
+@writes
+@profiled
+def bulk_update_certifications():
+    clear_screen()
+    divider("Bulk Update Certifications")
+    print("Pick certifications (blank to match any):")
+    criteria = certification_filter(
+        institution=input("  Institution name: ").strip() or None,
+        course=input("  Course name: ").strip() or None,
+        level=input("  Level: ").strip() or None,
+        expires_from=prompt_date("  Expiring from (YYYY-MM-DD): ", allow_blank=True),
+        expires_to=prompt_date("  Expiring to (YYYY-MM-DD): ", allow_blank=True),
+    )
+    print("\nChanges (blank to keep):")
+    values = bulk_values(
+        extend=prompt_period("  Extend expiry by (e.g. 1y, 6m, -30d): "),
+        set_issue=prompt_date("  New issue date (YYYY-MM-DD): ", allow_blank=True),
+        set_level=input("  New level: ").strip() or None,
+    )
+    if not values:
+        input("\nNothing to change. Press Enter to continue...")
+        return
+
+    session = SessionLocal()
+    try:
+        start = time.perf_counter()
+        matched = count_matching(session, criteria)
+        print(
+            f"\n{matched} certifications match "
+            f"(counted in {time.perf_counter() - start:.3f}s)."
+        )
+        if matched and confirm(f"Update all {matched}? [y/N]: "):
+            start = time.perf_counter()
+            changed = bulk_update(session, criteria, values)
+            print(
+                f"Updated {changed} certifications in "
+                f"{time.perf_counter() - start:.3f}s."
+            )
+        else:
+            print("Nothing changed.")
+    except Exception as e:
+        print(f"\nError updating certifications: {e}")
+    finally:
+        session.close()
+    input("\nPress Enter to continue...")
+
+
+# ---------------------- Search ----------------------
+@profiled
+def search_records():
+    clear_screen()
+    query = prompt_non_empty("Search (words or word prefixes): ")
+    session = SessionLocal()
+    try:
+        hits = search(session, query)
+        context = hit_context(session, hits)
+        divider(f"Results for '{query}'")
+        if not hits:
+            print("No matches.")
+        for kind, ref_id, title in hits:
+            print(
+                f"[{kind.capitalize()} {ref_id}] {title} | {context.get((kind, ref_id), '')}"
+            )
+    finally:
+        session.close()
+    input("\nPress Enter to continue...")
+
+
 # ---------------------- Reports ----------------------
 def reports_menu():
     while True:
         clear_screen()
         print("\n--- Reports Menu ---")
         print("1. View All Certifications by Institution")
-        print("2. View Expiring (≤30 days) / Expired")
-        print("3. Back to Main Menu")
+        print(f"2. View Expiring (≤{EXPIRING_SOON_DAYS} days) / Expired")
+        print("3. View Status Summary by Institution & Course")
+        print("4. Back to Main Menu")
         choice = input("Select an option: ").strip()
 
         if choice == "1":
             report_certs_by_institution()
         elif choice == "2":
-            report_expiry_overview()
+            days = prompt_int(
+                f"Horizon in days [{EXPIRING_SOON_DAYS}]: ", allow_blank=True
+            )
+            report_expiry_overview(EXPIRING_SOON_DAYS if days is None else days)
         elif choice == "3":
+            report_status_summary()
+        elif choice == "4":
             break
         else:
             input("\nInvalid choice. Press Enter to try again...")
 
 
+@profiled
 def report_certs_by_institution():
     session = SessionLocal()
-    institutions = session.query(Institution).order_by(Institution.name).all()
-    if not institutions:
-        print("\nNo data.")
+    try:
+        records = stream_records(
+            session, certifications_by_institution(), InstitutionReportRecord
+        )
+        show(institution_report_lines(records))
+    finally:
         session.close()
-        input("\nPress Enter to continue...")
-        return
+    input("\nPress Enter to continue...")
 
-    report = {}
-    for inst in institutions:
-        course_list = []
-        for course in inst.courses:
-            certs = [
-                (cert.title, cert.status) for cert in course.certifications
-            ]
-            course_list.append((course.name, certs))
-        report[inst.name] = course_list
-
-    divider("Certifications by Institution")
-    for inst_name, courses in report.items():
-        print(f"\n{inst_name}")
-        if not courses:
-            print("  (no courses)")
-            continue
-        for course_name, certs in courses:
-            print(f"  Course: {course_name}")
-            if not certs:
-                print("    (no certifications)")
-            else:
-                for title, status in certs:
-                    print(f"    - {title} ({status})")
-    session.close()
+
+def institution_report_lines(rows):
+    yield divider_text("Certifications by Institution")
+    found = False
+    inst_id = course_id = None
+    for row in rows:
+        found = True
+        if row.institution_id != inst_id:
+            inst_id, course_id = row.institution_id, None
+            yield f"\n{row.institution_name}"
+            if row.course_id is None:
+                yield "  (no courses)"
+                continue
+        if row.course_id != course_id:
+            course_id = row.course_id
+            yield f"  Course: {row.course_name}"
+            if row.title is None:
+                yield "    (no certifications)"
+                continue
+        yield f"    - {row.title} ({row.status})"
+    if not found:
+        yield "\nNo data."
+
+
+EXPIRY_COLUMNS = [
+    Column("ID", attrgetter("id"), ">"),
+    Column("Title", attrgetter("title")),
+    Column("Course", attrgetter("course_name")),
+    Column("Institution", attrgetter("institution_name")),
+    Column("Expires", attrgetter("expiry_date")),
+    Column("Status", attrgetter("status")),
+]
+
+
+@profiled
+def report_expiry_overview(days=EXPIRING_SOON_DAYS):
+    session = SessionLocal()
+    try:
+        certs = stream_records(session, expiring_listing(days), CertificationRecord)
+        show(expiry_report_lines(certs, days))
+    finally:
+        session.close()
     input("\nPress Enter to continue...")
 
 
-def report_expiry_overview():
+def expiry_report_lines(certs, days):
+    yield divider_text("Expiry Overview")
+    certs = iter(certs)
+    first = next(certs, None)
+    if first is None:
+        yield f"No expiring or expired certifications within {days} days."
+        return
+    yield from table(EXPIRY_COLUMNS, chain([first], certs))
+
+
+STATUS_COUNTS = ["valid", "expiring_soon", "expired", "no_expiry", "total"]
+
+
+@profiled
+def report_status_summary():
     session = SessionLocal()
-    from datetime import date, timedelta
+    try:
+        show(
+            status_report_lines(stream_records(session, status_rollup(), StatusRecord))
+        )
+    finally:
+        session.close()
+    input("\nPress Enter to continue...")
 
-    today = date.today()
-    soon = today + timedelta(days=30)
 
-    certs = (
-        session.query(Certification)
-        .order_by(Certification.expiry_date.asc().nulls_last())
-        .all()
+def status_report_lines(rows):
+    header = "".join(
+        f"{label:>10}" for label in ["Valid", "Soon", "Expired", "No Exp.", "Total"]
     )
-    divider("Expiry Overview")
-    found = False
-    for c in certs:
-        if c.expiry_date is None:
-            continue
-        if c.expiry_date <= soon or c.is_expired:
-            found = True
-            print(
-                f"[{c.id}] {c.title} | Course: {c.course.name} | Inst: {c.course.institution.name} | Expires: {c.expiry_date} | Status: {c.status}"
-            )
-    if not found:
-        print("No expiring or expired certifications within 30 days.")
-    session.close()
-    input("\nPress Enter to continue...")
+
+    def counts(values):
+        return "".join(f"{values[c]:>10}" for c in STATUS_COUNTS)
+
+    yield divider_text("Status Summary")
+    grand = dict.fromkeys(STATUS_COUNTS, 0)
+    inst_totals = None
+    inst_id = None
+    for row in rows:
+        if row.institution_id != inst_id:
+            if inst_totals is not None:
+                yield f"  {'Institution total':<38}{counts(inst_totals)}"
+            inst_id, inst_totals = row.institution_id, dict.fromkeys(STATUS_COUNTS, 0)
+            yield f"\n{row.institution_name}"
+            yield f"  {'Course':<38}{header}"
+        values = row._asdict()
+        yield f"  {row.course_name[:38]:<38}{counts(values)}"
+        for c in STATUS_COUNTS:
+            inst_totals[c] += values[c]
+            grand[c] += values[c]
+    if inst_totals is None:
+        yield "No certifications found."
+    else:
+        yield f"  {'Institution total':<38}{counts(inst_totals)}"
+        yield divider_text()
+        yield f"  {'All institutions':<38}{counts(grand)}"
@@ -0,0 +1,288 @@
+"""
+Non-interactive subcommands for scripts and schedulers. Nothing is
+cleared or paused; rows stream to stdout as JSON lines or CSV.
+
+Usage:
+    python main.py certs list --status expired --json
+    python main.py report expiry --days 30 --csv
+    python main.py report status
+    python main.py search "data sci" --kind course
+    python main.py summary
+    python main.py export --status expired -o expired.csv
+    python main.py import data.jsonl
+    python main.py scan --days 90 --workers 8 -o sweep.csv
+    python main.py changes since 1042 > delta.jsonl
+    python main.py changes compact
+    python main.py bulk --institution "Northwind University" --extend 1y --apply
+    python main.py dedupe --kind certifications --show
+    python main.py --profile report expiry > /dev/null
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from datetime import date, timedelta
+from lib.db.constants import EXPIRING_SOON_DAYS, STATUS_SLUGS
+from lib.helpers import date_arg
+from lib.profiling import profile
+
+# Importing SQLAlchemy and the models dominates the run time of a short
+# command, so only the standard library is loaded at module level. The
+# database modules are imported by the handlers that need them, after the
+# arguments have been parsed.
+
+# Delegated to the existing module entry points with their own options.
+DELEGATED = {
+    "import": "lib.importer",
+    "export": "lib.exporter",
+    "scan": "lib.scan",
+    "bulk": "lib.bulk",
+    "dedupe": "lib.dedupe",
+}
+
+
+def _listing(listing):
+    from lib.db.queries import STREAM_BATCH
+
+    stmt, sort_col, id_col = listing
+    return stmt.order_by(sort_col, id_col).execution_options(yield_per=STREAM_BATCH)
+
+
+def _rows(session, stmt, record_type, today):
+    """(fields, records) for ``stmt``, streamed as ``record_type`` dicts."""
+    from lib.db.records import stream_records
+
+    fields = record_type._fields
+    records = stream_records(session, stmt, record_type, today)
+    return list(fields), (dict(zip(fields, record)) for record in records)
+
+
+def institutions_list(session, args, today):
+    from lib.db.queries import institutions_listing
+    from lib.db.records import InstitutionRecord
+
+    return _rows(session, _listing(institutions_listing()), InstitutionRecord, today)
+
+
+def courses_list(session, args, today):
+    from lib.db.models import Institution
+    from lib.db.queries import courses_listing
+    from lib.db.records import CourseRecord
+
+    stmt = _listing(courses_listing())
+    if args.institution is not None:
+        stmt = stmt.where(Institution.name == args.institution)
+    return _rows(session, stmt, CourseRecord, today)
+
+
+def certs_list(session, args, today):
+    from lib.db.queries import certifications_export
+    from lib.db.records import CertificationRecord
+
+    expires_to = args.expires_to
+    if args.expires_within is not None:
+        horizon = today + timedelta(days=args.expires_within)
+        expires_to = min(expires_to, horizon) if expires_to else horizon
+    stmt = certifications_export(
+        status=STATUS_SLUGS.get(args.status),
+        institution=args.institution,
+        expires_from=args.expires_from,
+        expires_to=expires_to,
+        today=today,
+    )
+    return _rows(session, stmt, CertificationRecord, today)
+
+
+def report_expiry(session, args, today):
+    from lib.db.queries import expiring_listing
+    from lib.db.records import CertificationRecord
+
+    stmt = expiring_listing(args.days, today)
+    return _rows(session, stmt, CertificationRecord, today)
+
+
+def report_status(session, args, today):
+    from lib.db.queries import status_rollup
+    from lib.db.records import StatusRecord
+
+    return _rows(session, status_rollup(today), StatusRecord, today)
+
+
+def report_by_institution(session, args, today):
+    from lib.db.queries import certifications_by_institution
+    from lib.db.records import InstitutionReportRecord
+
+    stmt = certifications_by_institution()
+    return _rows(session, stmt, InstitutionReportRecord, today)
+
+
+def search_records(session, args, today):
+    from lib.db.search import search
+
+    hits = search(session, args.query, args.limit, kind=args.kind)
+    return ["kind", "ref_id", "title"], (hit._asdict() for hit in hits)
+
+
+def summary_counts(session, args, today):
+    from lib.db.summary import read_summary
+
+    counts = read_summary(session, today)
+    return ["as_of", *counts], [dict(counts, as_of=today)]
+
+
+def changes_list(session, args, today):
+    from lib.db.changes import FIELDS, as_csv, changes_since
+
+    changes = changes_since(session, args.seq)
+    if args.format == "csv":
+        changes = map(as_csv, changes)
+    return FIELDS, changes
+
+
+def changes_head(session, args, today):
+    from lib.db.changes import head
+
+    return ["seq"], [{"seq": head(session)}]
+
+
+def changes_compact(session, args, today):
+    from sqlalchemy import func, select
+    from lib.db.changes import compact
+    from lib.db.models import ChangeLog
+
+    removed = compact(session.connection(), args.upto)
+    session.commit()
+    remaining = session.scalar(select(func.count()).select_from(ChangeLog))
+    return ["removed", "remaining"], [{"removed": removed, "remaining": remaining}]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Course & Certification Tracker commands."
+    )
+    output = argparse.ArgumentParser(add_help=False)
+    formats = output.add_mutually_exclusive_group()
+    formats.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    formats.add_argument(
+        "--json", dest="format", action="store_const", const="jsonl", help="JSON lines"
+    )
+    formats.add_argument("--csv", dest="format", action="store_const", const="csv")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    institutions = commands.add_parser(
+        "institutions", help="list institutions by name"
+    ).add_subparsers(dest="action", required=True)
+    institutions.add_parser("list", parents=[output]).set_defaults(
+        handler=institutions_list
+    )
+
+    courses = commands.add_parser(
+        "courses", help="list courses by name"
+    ).add_subparsers(dest="action", required=True)
+    courses_cmd = courses.add_parser("list", parents=[output])
+    courses_cmd.add_argument("--institution", help="institution name")
+    courses_cmd.set_defaults(handler=courses_list)
+
+    certs = commands.add_parser(
+        "certs", help="list certifications by id"
+    ).add_subparsers(dest="action", required=True)
+    certs_cmd = certs.add_parser("list", parents=[output])
+    certs_cmd.add_argument("--status", choices=sorted(STATUS_SLUGS))
+    certs_cmd.add_argument("--institution", help="institution name")
+    certs_cmd.add_argument("--expires-from", type=date_arg, metavar="YYYY-MM-DD")
+    certs_cmd.add_argument("--expires-to", type=date_arg, metavar="YYYY-MM-DD")
+    certs_cmd.add_argument(
+        "--expires-within",
+        type=int,
+        metavar="DAYS",
+        help="expired or expiring within DAYS from today",
+    )
+    certs_cmd.set_defaults(handler=certs_list)
+
+    report = commands.add_parser(
+        "report", help="expiry, status and by-institution reports"
+    ).add_subparsers(dest="action", required=True)
+    expiry = report.add_parser("expiry", parents=[output])
+    expiry.add_argument("--days", type=int, default=EXPIRING_SOON_DAYS)
+    expiry.set_defaults(handler=report_expiry)
+    report.add_parser("status", parents=[output]).set_defaults(handler=report_status)
+    report.add_parser("by-institution", parents=[output]).set_defaults(
+        handler=report_by_institution
+    )
+
+    search_cmd = commands.add_parser(
+        "search", parents=[output], help="full-text search"
+    )
+    search_cmd.add_argument("query")
+    search_cmd.add_argument(
+        "--kind", choices=["institution", "course", "certification"]
+    )
+    search_cmd.add_argument("--limit", type=int, default=20)
+    search_cmd.set_defaults(handler=search_records)
+
+    commands.add_parser(
+        "summary", parents=[output], help="live expiry bucket counts"
+    ).set_defaults(handler=summary_counts)
+
+    changes = commands.add_parser(
+        "changes", help="incremental change log"
+    ).add_subparsers(dest="action", required=True)
+    since = changes.add_parser(
+        "since", parents=[output], help="latest change to each row after SEQ"
+    )
+    since.add_argument("seq", type=int)
+    since.set_defaults(handler=changes_list)
+    changes.add_parser(
+        "head", parents=[output], help="sequence number of the latest change"
+    ).set_defaults(handler=changes_head)
+    compact = changes.add_parser(
+        "compact", parents=[output], help="drop superseded entries"
+    )
+    compact.add_argument(
+        "--upto",
+        type=int,
+        metavar="SEQ",
+        help="also drop every entry up to SEQ, once all consumers have it",
+    )
+    compact.set_defaults(handler=changes_compact)
+
+    for name in DELEGATED:
+        commands.add_parser(name, add_help=False, help=f"see {name} --help")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in DELEGATED:
+        with profile(argv[0]):
+            return importlib.import_module(DELEGATED[argv[0]]).main(argv[1:])
+    args = build_parser().parse_args(argv)
+    with profile(" ".join(filter(None, [args.command, getattr(args, "action", None)]))):
+        return run(args)
+
+
+def run(args):
+    """Run a parsed subcommand, writing its records to stdout."""
+    from lib.db.models import SessionLocal, init_db
+    from lib.exporter import write_csv, write_jsonl
+
+    today = date.today()
+    init_db()
+    session = SessionLocal()
+    write = write_csv if args.format == "csv" else write_jsonl
+    try:
+        fields, records = args.handler(session, args, today)
+        write(records, sys.stdout, fields)
+    except BrokenPipeError:
+        # The reader (e.g. ``head``) went away; that is not an error here.
+        # Point stdout at devnull so the flush at exit does not fail again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Asyncio access to the tracker's models, for services that run many
+lookups and report queries at once.
+
+This module needs the optional aiosqlite driver and SQLAlchemy's greenlet
+support (``pip install aiosqlite greenlet``); the rest of the tracker does
+not. The async engine uses the same database file and storage PRAGMAs as
+``models.engine``, and the ORM listeners that maintain the expiry summary
+run for async flushes too.
+
+Each pooled connection runs on its own aiosqlite thread, so with the
+``wal`` storage profile concurrent reads proceed in parallel; SQLite still
+serialises writes.
+
+    async with AsyncSessionLocal() as session:
+        page = await certifications_page(session)
+        cert = await get(session, Certification, page.rows[0].id)
+"""
+
+import importlib.util
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from lib.db.constants import EXPIRING_SOON_DAYS
+from lib.db.models import STORAGE, ensure_schema
+from lib.db.queries import (
+    PAGE_SIZE,
+    certifications_by_institution,
+    certifications_listing,
+    courses_listing,
+    expiring_listing,
+    institutions_listing,
+    keyset_select,
+    make_page,
+    status_rollup,
+)
+from lib.db.records import (
+    CertificationRecord,
+    CourseRecord,
+    InstitutionRecord,
+    InstitutionReportRecord,
+    StatusRecord,
+    to_records,
+)
+from lib.db.search import search
+from lib.db.storage import listen_pragmas
+from lib.db.summary import read_summary
+
+
+def create_async_storage_engine(settings, **kwargs):
+    """Async engine for ``settings['path']`` that applies the PRAGMAs on connect."""
+    if importlib.util.find_spec("aiosqlite") is None:
+        raise ImportError(
+            "lib.db.aio needs the aiosqlite package: pip install aiosqlite"
+        )
+    engine = create_async_engine(f"sqlite+aiosqlite:///{settings['path']}", **kwargs)
+    listen_pragmas(engine.sync_engine, settings)
+    return engine
+
+
+async_engine = create_async_storage_engine(STORAGE)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+async def init_db():
+    """Async form of ``models.init_db``."""
+    async with async_engine.begin() as connection:
+        await connection.run_sync(ensure_schema)
+
+
+# ---------------------- Listings ----------------------
+async def fetch_page(
+    session, listing, record_type, page_size=PAGE_SIZE, after=None, before=None
+):
+    """Async form of ``records_page`` for a ``*_listing()`` tuple."""
+    stmt, sort_col, id_col = listing
+    stmt = keyset_select(stmt, sort_col, id_col, page_size, after, before)
+    rows = list(to_records((await session.execute(stmt)).all(), record_type))
+    return make_page(rows, sort_col, id_col, page_size, after, before)
+
+
+async def institutions_page(session, **cursor):
+    return await fetch_page(
+        session, institutions_listing(), InstitutionRecord, **cursor
+    )
+
+
+async def courses_page(session, **cursor):
+    return await fetch_page(session, courses_listing(), CourseRecord, **cursor)
+
+
+async def certifications_page(session, **cursor):
+    return await fetch_page(
+        session, certifications_listing(), CertificationRecord, **cursor
+    )
+
+
+# ---------------------- Reports ----------------------
+async def stream(session, stmt, record_type, today=None):
+    """Yield ``record_type`` records for ``stmt`` as rows are fetched, in chunks."""
+    result = await session.stream(stmt)
+    async for partition in result.partitions():
+        for record in to_records(partition, record_type, today):
+            yield record
+
+
+def expiring(session, days=EXPIRING_SOON_DAYS, today=None):
+    """Records of the expiry report, soonest first, as an async iterator."""
+    return stream(session, expiring_listing(days, today), CertificationRecord, today)
+
+
+def by_institution(session, today=None):
+    """Records of the certifications-by-institution report, as an async iterator."""
+    return stream(
+        session, certifications_by_institution(), InstitutionReportRecord, today
+    )
+
+
+async def status_summary(session, today=None):
+    """Per-course status counts, as ``StatusRecord`` records."""
+    rows = (await session.execute(status_rollup(today))).all()
+    return list(to_records(rows, StatusRecord))
+
+
+async def expiry_totals(session, today=None):
+    """The live expiry bucket counts of ``summary.read_summary``."""
+    return await session.run_sync(read_summary, today)
+
+
+async def search_records(session, query, limit=20, kind=None):
+    """Ranked full-text matches, as returned by ``search.search``."""
+    return await session.run_sync(search, query, limit, kind)
+
+
+# ---------------------- CRUD ----------------------
+async def get(session, model, record_id):
+    return await session.get(model, record_id)
+
+
+async def add(session, record):
+    session.add(record)
+    await session.commit()
+    return record
+
+
+async def update(session, record, **values):
+    for name, value in values.items():
+        setattr(record, name, value)
+    await session.commit()
+    return record
+
+
+async def delete(session, record):
+    """Delete ``record`` and, like the CLI, its dependent rows."""
+    await session.delete(record)
+    await session.commit()
@@ -0,0 +1,176 @@
+"""
+Append-only change log for incremental exports.
+
+Triggers on institutions, courses and certifications add a ``change_log``
+row for every insert, update and delete, inside the transaction that makes
+the change, so the log commits or rolls back with it. This covers ORM
+flushes, the importer, bulk updates and cascaded deletes alike. Sequence
+numbers only ever increase.
+
+``changes_since`` returns the latest change to each row after a sequence
+number, with the row as it is now; a sync job stores the last ``seq`` it
+has seen and asks again from there. Inserts and updates carry the current
+row and are best applied as upserts; deletes carry no row. Rows that
+existed before the log was created are not in it, so a new consumer takes
+``head()`` first, then a full export, then follows the log from that head.
+
+``compact`` removes entries superseded by a later change to the same row.
+Consumers get the same result from ``changes_since`` before and after, so
+it needs no coordination with them. Deletes are kept as tombstones. Given
+the lowest ``seq`` every consumer has acknowledged, it also removes every
+entry up to it, tombstones included: no consumer asks from before it, and
+a new one starts from ``head()`` and a full export.
+
+Usage:
+    python main.py changes since 1042 > delta.jsonl
+    python main.py changes head
+    python main.py changes compact --upto 1042
+"""
+
+import json
+from sqlalchemy import delete, select, text
+from lib.db.models import Institution, Course, Certification, ChangeLog
+from lib.db.queries import STREAM_BATCH
+
+TABLES = {
+    model.__tablename__: model.__table__
+    for model in (Institution, Course, Certification)
+}
+
+# (trigger suffix, event, op, row alias holding the id)
+_EVENTS = [
+    ("ai", "INSERT", "insert", "new"),
+    ("au", "UPDATE", "update", "new"),
+    ("ad", "DELETE", "delete", "old"),
+]
+
+_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS change_log_{table}_{suffix} AFTER {event} ON {table} BEGIN
+        INSERT INTO change_log(table_name, row_id, op)
+        VALUES ('{table}', {alias}.id, '{op}');
+    END
+"""
+
+# Columns computed from the others. Updates that only fill these are not
+# changes, so the update triggers list the remaining columns.
+DERIVED = {"fingerprint"}
+
+
+def _event(table, event):
+    if event != "UPDATE":
+        return event
+    columns = [c.name for c in TABLES[table].columns if c.name not in DERIVED]
+    return f"UPDATE OF {', '.join(columns)}"
+
+
+CHANGE_TRIGGERS = [
+    _TRIGGER.format(
+        table=table, suffix=suffix, event=_event(table, event), op=op, alias=alias
+    )
+    for table in TABLES
+    for suffix, event, op, alias in _EVENTS
+]
+
+FIELDS = ["seq", "table", "row_id", "op", "changed_at", "row"]
+
+
+def create_change_triggers(connection):
+    """Create the change log triggers that are missing."""
+    for statement in CHANGE_TRIGGERS:
+        connection.exec_driver_sql(statement)
+
+
+def _superseded(entry):
+    """Whether a later entry exists for the same row as ``entry``."""
+    later = ChangeLog.__table__.alias("later")
+    # Selecting an indexed column keeps the probe on the index alone.
+    return (
+        select(later.c.seq)
+        .where(
+            later.c.table_name == entry.table_name,
+            later.c.row_id == entry.row_id,
+            later.c.seq > entry.seq,
+        )
+        .exists()
+    )
+
+
+def head(session):
+    """The sequence number of the latest change, 0 if there is none."""
+    # AUTOINCREMENT keeps the highest seq ever used here, so compacting the
+    # latest entries away does not move the head back.
+    return (
+        session.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        ).scalar()
+        or 0
+    )
+
+
+def latest_changes(since=0):
+    """
+    Log entries after ``since`` that no later entry supersedes, in sequence
+    order: a range read on the primary key plus one index probe per entry.
+    """
+    entry = ChangeLog.__table__.c
+    return (
+        select(entry.seq, entry.table_name, entry.row_id, entry.op, entry.changed_at)
+        .where(entry.seq > since, ~_superseded(entry))
+        .order_by(entry.seq)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+
+def changes_since(session, since=0):
+    """
+    The latest change to each row after ``since`` as dicts with ``FIELDS``,
+    in sequence order. Streams in batches; each batch fetches its rows with
+    one query per table.
+    """
+    for batch in session.execute(latest_changes(since)).partitions():
+        rows = _current_rows(session, batch)
+        for seq, table, row_id, op, changed_at in batch:
+            yield {
+                "seq": seq,
+                "table": table,
+                "row_id": row_id,
+                "op": op,
+                "changed_at": changed_at,
+                "row": rows.get((table, row_id)),
+            }
+
+
+def _current_rows(session, entries):
+    """{(table, id): row dict} for the rows of ``entries`` that still exist."""
+    ids = {}
+    for entry in entries:
+        if entry.op != "delete":
+            ids.setdefault(entry.table_name, []).append(entry.row_id)
+    rows = {}
+    for name, row_ids in ids.items():
+        table = TABLES[name]
+        columns = [c for c in table.columns if c.name not in DERIVED]
+        for row in session.execute(select(*columns).where(table.c.id.in_(row_ids))):
+            rows[name, row.id] = dict(row._mapping)
+    return rows
+
+
+def as_csv(change):
+    """``change`` with its row encoded as JSON, for a CSV column."""
+    row = change["row"]
+    return dict(change, row=None if row is None else json.dumps(row, default=str))
+
+
+def compact(connection, upto=None):
+    """
+    Delete entries that a later entry for the same row supersedes and, if
+    ``upto`` is given, every entry up to and including it. Returns the
+    number deleted.
+    """
+    removed = 0
+    if upto is not None:
+        removed += connection.execute(
+            delete(ChangeLog).where(ChangeLog.seq <= upto)
+        ).rowcount
+    stmt = delete(ChangeLog).where(_superseded(ChangeLog.__table__.c))
+    return removed + connection.execute(stmt).rowcount
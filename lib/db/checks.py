@@ -0,0 +1,543 @@
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from lib.db.models import (
+    DB_PATH,
+    EXPIRING_SOON_DAYS,
+    STORAGE,
+    SessionLocal,
+    ensure_schema,
+    Institution,
+    Course,
+    Certification,
+    ExpirySummary,
+    certification_status,
+)
+from lib.db.changes import latest_changes
+from lib.db.fingerprints import fingerprint
+from lib.db.queries import (
+    STATUS_SLUGS,
+    certification_filter,
+    certifications_by_institution,
+    certifications_listing,
+    courses_listing,
+    expiring_listing,
+    institutions_listing,
+    keyset_select,
+    prefix_matches,
+    status_filter,
+    status_rollup,
+)
+from lib.db.records import (
+    CertificationRecord,
+    CourseRecord,
+    InstitutionRecord,
+    InstitutionReportRecord,
+    StatusRecord,
+    status_classifier,
+)
+from lib.db.summary import BUCKETS, read_summary, rebuild
+from lib.db.storage import create_storage_engine
+from lib.bulk import bulk_update, bulk_values, count_matching, parse_period
+from lib.dedupe import KINDS, duplicate_groups, resolve
+from lib.exporter import export_rows, write_csv, write_jsonl
+from lib.scan import chunk_select, scan
+
+
+def explain_query_plan(session, stmt):
+    """Return the detail column of SQLite's EXPLAIN QUERY PLAN for ``stmt``."""
+    bind = session.get_bind()
+    sql = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    return [row[-1] for row in rows]
+
+
+def _plan_uses(plan, index_name):
+    return any(
+        f"USING INDEX {index_name}" in step
+        or f"USING COVERING INDEX {index_name}" in step
+        for step in plan
+    )
+
+
+def check_query_plans(session):
+    """
+    Assert that the report and relationship queries are served by the
+    secondary indexes instead of full table scans.
+    """
+    checks = [
+        (
+            "expiry overview",
+            expiring_listing(),
+            "ix_certifications_expiry_date",
+        ),
+        (
+            "courses by institution",
+            select(Course).where(Course.institution_id == 1),
+            "ix_courses_institution_id",
+        ),
+        (
+            "certifications by course",
+            select(Certification).where(Certification.course_id == 1),
+            # Either index leading with course_id serves it; this prefix
+            # matches both.
+            "ix_certifications_course_id_",
+        ),
+        (
+            "certifications by institution (institutions)",
+            certifications_by_institution(),
+            "ix_institutions_name",
+        ),
+        (
+            "certifications by institution (courses)",
+            certifications_by_institution(),
+            "ix_courses_institution_id",
+        ),
+        (
+            "certifications by institution (certifications)",
+            certifications_by_institution(),
+            "ix_certifications_course_id_expiry_date",
+        ),
+        (
+            "status summary",
+            status_rollup(),
+            "ix_certifications_course_id_expiry_date",
+        ),
+    ]
+    for label, stmt, index_name in checks:
+        plan = explain_query_plan(session, stmt)
+        assert _plan_uses(plan, index_name), f"{label}: {index_name} unused in {plan}"
+
+    # The status summary counts from the index alone, never the table rows.
+    plan = explain_query_plan(session, status_rollup())
+    index_name = "ix_certifications_course_id_expiry_date"
+    assert _plan_covered(plan, index_name), f"status summary: {plan}"
+
+    # Keyset pages seek on the sort key index and stop after one page.
+    for label, listing, index_name in [
+        ("institutions page", institutions_listing(), "ix_institutions_name"),
+        ("courses page", courses_listing(), "ix_courses_name"),
+        ("certifications page", certifications_listing(), "ix_certifications_title"),
+    ]:
+        stmt, sort_col, id_col = listing
+        for cursor in [{}, {"after": ("M", 1)}, {"before": ("M", 1)}]:
+            plan = explain_query_plan(
+                session, keyset_select(stmt, sort_col, id_col, **cursor)
+            )
+            assert _plan_uses(
+                plan, index_name
+            ), f"{label}: {index_name} unused in {plan}"
+            assert not any("TEMP B-TREE" in step for step in plan), f"{label}: {plan}"
+
+    # The record picker's name lookup is a bounded range seek.
+    for label, (_, sort_col, id_col), index_name in [
+        ("institution picker", institutions_listing(), "ix_institutions_name"),
+        ("course picker", courses_listing(), "ix_courses_name"),
+        ("certification picker", certifications_listing(), "ix_certifications_title"),
+    ]:
+        plan = explain_query_plan(session, prefix_matches(sort_col, id_col, "M", 10))
+        assert _plan_uses(plan, index_name), f"{label}: {index_name} unused in {plan}"
+        assert not any("TEMP B-TREE" in step for step in plan), f"{label}: {plan}"
+
+    # Each chunk of the parallel scan reads its id range by primary key.
+    plan = explain_query_plan(session, chunk_select(1, 1000, date.today()))
+    assert any(
+        "certifications USING INTEGER PRIMARY KEY" in step for step in plan
+    ), f"scan chunk: {plan}"
+
+    # The change feed reads the log by sequence range and probes the
+    # (table_name, row_id, seq) index for later entries, never sorting.
+    plan = explain_query_plan(session, latest_changes(100))
+    assert any(
+        "change_log USING INTEGER PRIMARY KEY (rowid>?)" in step for step in plan
+    ), f"changes since: {plan}"
+    index_name = "ix_change_log_table_name_row_id_seq"
+    assert _plan_covered(plan, index_name), f"changes since: {plan}"
+    assert not any("TEMP B-TREE" in step for step in plan), f"changes since: {plan}"
+
+    # Duplicates are grouped by one pass over each (scope, fingerprint) index.
+    for kind, index_name in [
+        ("institutions", "ix_institutions_fingerprint"),
+        ("courses", "ix_courses_institution_id_fingerprint"),
+        ("certifications", "ix_certifications_course_id_fingerprint"),
+    ]:
+        plan = explain_query_plan(session, duplicate_groups(kind))
+        assert _plan_covered(plan, index_name), f"{kind} duplicates: {plan}"
+        assert not any("TEMP B-TREE" in step for step in plan), f"{kind}: {plan}"
+
+    # Both reports read rows in index order, so results stream without a sort.
+    for label, stmt in [
+        ("expiry overview", expiring_listing()),
+        ("certifications by institution", certifications_by_institution()),
+    ]:
+        plan = explain_query_plan(session, stmt)
+        assert not any("TEMP B-TREE" in step for step in plan), f"{label}: {plan}"
+
+
+def _plan_covered(plan, index_name):
+    return any(f"USING COVERING INDEX {index_name}" in step for step in plan)
+
+
+def check_status_expressions(session, today=None):
+    """
+    Assert that the SQL forms of status_on / days_to_expiry_on /
+    is_expired_on and status_filter() agree with the Python ones, for today
+    and for reference dates on each side of the status boundaries of an
+    existing expiry date.
+    """
+    today = today or date.today()
+    reference_dates = [today]
+    sample = session.execute(
+        select(Certification.expiry_date)
+        .where(Certification.expiry_date.is_not(None))
+        .limit(1)
+    ).scalar()
+    if sample is not None:
+        for days in (0, 1, -EXPIRING_SOON_DAYS, -EXPIRING_SOON_DAYS - 1):
+            reference_dates.append(sample + timedelta(days=days))
+
+    for as_of in reference_dates:
+        stmt = select(
+            Certification.id,
+            Certification.expiry_date,
+            Certification.status_on(as_of).label("status"),
+            Certification.days_to_expiry_on(as_of).label("days"),
+            Certification.is_expired_on(as_of).label("expired"),
+        ).execution_options(yield_per=1000)
+        counts = {}
+        classify = status_classifier(as_of)
+        for row in session.execute(stmt):
+            cert = Certification(expiry_date=row.expiry_date)
+            expected = (
+                cert.status_on(as_of),
+                cert.days_to_expiry_on(as_of),
+                cert.is_expired_on(as_of),
+            )
+            actual = (row.status, row.days, bool(row.expired))
+            assert actual == expected, f"{row.id} on {as_of}: {actual} != {expected}"
+            assert row.status == certification_status(row.expiry_date, as_of)
+            assert row.status == classify(row.expiry_date)
+            counts[row.status] = counts.get(row.status, 0) + 1
+
+        for status in STATUS_SLUGS.values():
+            filtered = session.execute(
+                select(func.count()).where(status_filter(status, as_of))
+            ).scalar()
+            expected = counts.get(status, 0)
+            assert (
+                filtered == expected
+            ), f"{status} on {as_of}: {filtered} != {expected}"
+
+
+def check_records():
+    """
+    Assert that each read-model record has its query's columns in order,
+    plus ``status`` where the record computes one.
+    """
+    for stmt, record_type in [
+        (institutions_listing()[0], InstitutionRecord),
+        (courses_listing()[0], CourseRecord),
+        (certifications_listing()[0], CertificationRecord),
+        (expiring_listing(), CertificationRecord),
+        (certifications_by_institution(), InstitutionReportRecord),
+        (status_rollup(), StatusRecord),
+    ]:
+        columns = [column.key for column in stmt.selected_columns]
+        fields = [f for f in record_type._fields if f != "status"]
+        assert columns == fields, f"{record_type.__name__}: {columns} != {fields}"
+
+
+def check_fingerprints():
+    """Assert that fingerprints ignore case, accents, spacing and punctuation."""
+    assert fingerprint("Moringa School") == fingerprint("  moringa-school. ")
+    assert fingerprint("Université Laval") == fingerprint("UNIVERSITE LAVAL")
+    assert fingerprint("Data Science", "Advanced") == fingerprint(
+        "data  science", "advanced"
+    )
+    assert fingerprint("Data Science", None) == fingerprint("Data Science", "")
+    assert fingerprint("Data Science", "Advanced") != fingerprint(
+        "Data Science", "Foundation"
+    )
+    assert fingerprint("ab", "c") != fingerprint("a", "bc")
+
+
+def check_expiry_summary(session, today=None):
+    """Assert that the maintained expiry summary matches a full recount."""
+    today = today or date.today()
+    maintained = read_summary(session, today)
+    connection = session.connection()
+    with connection.begin_nested() as savepoint:
+        rebuild(connection, today)
+        recounted = dict.fromkeys(BUCKETS, 0)
+        recounted.update(
+            connection.execute(select(ExpirySummary.bucket, ExpirySummary.count)).all()
+        )
+        savepoint.rollback()
+    assert maintained == recounted, f"summary {maintained} != {recounted}"
+
+
+def check_summary_listeners(session, today=None):
+    """
+    Assert that the listeners keep the expiry summary equal to a recount
+    when expiry dates change on objects whose old value was not loaded.
+    """
+    today = today or date.today()
+    course = Course(name="Data Science", institution=Institution(name="Moringa"))
+    dated = Certification(
+        title="Dated", expiry_date=today - timedelta(days=100), course=course
+    )
+    undated = Certification(title="Undated", course=course)
+    session.add_all([dated, undated])
+    session.commit()
+    session.expire_all()
+    dated.expiry_date = today + timedelta(days=3)
+    undated.expiry_date = today + timedelta(days=300)
+    session.commit()
+    check_expiry_summary(session, today)
+
+
+def check_dedupe(session, today=None):
+    """
+    Merge a known set of duplicates and assert which rows are kept, where
+    their courses and certifications moved, the folded dates and the summary.
+    """
+    today = today or date.today()
+    moringa = Institution(name="Moringa School")
+    twin = Institution(name="moringa-school.")
+    other = Institution(name="Strathmore")
+    science = Course(name="Data Science", institution=moringa)
+    science_twin = Course(name="data  science", institution=twin)
+    web = Course(name="Web Development", institution=twin)
+    kept = Certification(
+        title="Python",
+        level="Advanced",
+        issue_date=today - timedelta(days=400),
+        expiry_date=today - timedelta(days=35),
+        course=science,
+    )
+    merged = Certification(
+        title="PYTHON",
+        level="advanced",
+        issue_date=today - timedelta(days=30),
+        expiry_date=today + timedelta(days=335),
+        course=science_twin,
+    )
+    html = Certification(title="HTML", course=web)
+    sql = Certification(
+        title="SQL", expiry_date=today + timedelta(days=3), course=science
+    )
+    session.add_all([other, kept, merged, html, sql])
+    session.commit()
+
+    removed = {kind: resolve(session, kind) for kind in KINDS}
+    session.commit()
+    assert removed == {"institutions": 1, "courses": 1, "certifications": 1}, removed
+
+    institutions = session.scalars(select(Institution.id)).all()
+    assert sorted(institutions) == sorted([moringa.id, other.id]), institutions
+    courses = dict(session.execute(select(Course.id, Course.institution_id)).all())
+    assert courses == {science.id: moringa.id, web.id: moringa.id}, courses
+    certifications = {
+        row.id: row[1:]
+        for row in session.execute(
+            select(
+                Certification.id,
+                Certification.course_id,
+                Certification.issue_date,
+                Certification.expiry_date,
+            )
+        )
+    }
+    expected = {
+        kept.id: (science.id, merged.issue_date, merged.expiry_date),
+        html.id: (web.id, None, None),
+        sql.id: (science.id, None, sql.expiry_date),
+    }
+    assert certifications == expected, f"{certifications} != {expected}"
+    check_expiry_summary(session, today)
+
+
+def check_scan(session, today=None):
+    """
+    Assert that the parallel scan writes the expiry report's rows, in its
+    order, including titles with quotes and line breaks.
+    """
+    today = today or date.today()
+    course = Course(name="Data Science", institution=Institution(name="Moringa"))
+    titles = ["Plain", "Two\nlines", "Carriage\r\nreturn", 'Say "hi", then\rgo']
+    offsets = [5, -3, 200, 5, None, 0, -400, 12, 5, 31]
+    session.add_all(
+        Certification(
+            title=titles[i % len(titles)],
+            level="Line\nlevel" if i % 3 else None,
+            expiry_date=None if days is None else today + timedelta(days=days),
+            course=course,
+        )
+        for i, days in enumerate(offsets)
+    )
+    session.commit()
+    path = session.get_bind().url.database
+    stmt = expiring_listing(today=today)
+
+    expected = io.StringIO()
+    write_csv(export_rows(session, stmt, today), expected)
+    scanned = io.StringIO()
+    count = scan(path, scanned, today=today, workers=2, chunk_size=3)
+    expected_rows = list(csv.reader(io.StringIO(expected.getvalue())))
+    scanned_rows = list(csv.reader(io.StringIO(scanned.getvalue())))
+    assert count == len(expected_rows) - 1, f"scan wrote {count} rows"
+    assert scanned_rows == expected_rows, f"{scanned_rows} != {expected_rows}"
+
+    expected = io.StringIO()
+    write_jsonl(export_rows(session, stmt, today), expected)
+    scanned = io.StringIO()
+    scan(path, scanned, today=today, fmt="jsonl", workers=2, chunk_size=3)
+    assert scanned.getvalue() == expected.getvalue(), scanned.getvalue()
+
+
+def check_bulk_update(session, today=None):
+    """
+    Assert that each kind of bulk update changes exactly the certifications
+    ``count_matching`` counts, and that the expiry summary stays equal to a
+    recount.
+    """
+    today = today or date.today()
+    north = Institution(name="Northwind")
+    south = Institution(name="Southwind")
+    courses = [
+        Course(name="Data Science", institution=north),
+        Course(name="Networking", institution=north),
+        Course(name="Data Science", institution=south),
+    ]
+    offsets = [-40, -1, 0, 3, 6, 7, 30, 31, 400, None]
+    for i in range(60):
+        days = offsets[i % len(offsets)]
+        session.add(
+            Certification(
+                title=f"Certificate {i}",
+                level=["Associate", "Expert", None][i // 3 % 3],
+                expiry_date=None if days is None else today + timedelta(days=days),
+                course=courses[i % len(courses)],
+            )
+        )
+    session.commit()
+    titles = dict(session.execute(select(Certification.id, Certification.title)).all())
+
+    def columns():
+        rows = session.execute(
+            select(
+                Certification.id,
+                Certification.expiry_date,
+                Certification.level,
+                Certification.fingerprint,
+            )
+        )
+        return {row.id: row[1:] for row in rows}
+
+    shift = timedelta(days=30)
+    new_expiry = today + timedelta(days=5)
+    for filters, changes, expected in [
+        (
+            {"institution": "Northwind", "status": "Expiring Soon"},
+            {"extend": parse_period("30d")},
+            lambda expiry, level: (expiry and expiry + shift, level),
+        ),
+        (
+            {"course": "Data Science", "level": "Expert"},
+            {"set_expiry": new_expiry},
+            lambda expiry, level: (new_expiry, level),
+        ),
+        (
+            {"expires_to": today, "level": "Associate"},
+            {"set_level": "Foundation"},
+            lambda expiry, level: (expiry, "Foundation"),
+        ),
+    ]:
+        criteria = certification_filter(today=today, **filters)
+        matching = set(session.scalars(select(Certification.id).where(*criteria)))
+        matched = count_matching(session, criteria)
+        assert matched == len(matching) > 0, f"{filters}: {matched} matched"
+        before = columns()
+        changed = bulk_update(session, criteria, bulk_values(**changes))
+        assert changed == matched, f"{changes}: {changed} != {matched}"
+        after = columns()
+        for cert_id, (expiry, level, _) in before.items():
+            if cert_id in matching:
+                values = expected(expiry, level)
+                values += (fingerprint(titles[cert_id], values[1]),)
+            else:
+                values = before[cert_id]
+            assert after[cert_id] == values, f"{changes} #{cert_id}: {after[cert_id]}"
+        check_expiry_summary(session, today)
+
+
+def copy_database(source, target):
+    """Copy database ``source`` to ``target`` with SQLite's online backup."""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def open_database(path):
+    """Session on ``path`` with the configured PRAGMAs and the current schema."""
+    engine = create_storage_engine(dict(STORAGE, path=path))
+    with engine.begin() as connection:
+        ensure_schema(connection)
+    return SessionLocal(bind=engine)
+
+
+@contextmanager
+def scratch_database(tmp, name, today=None):
+    """
+    Yield a session on a new, empty database ``name`` in directory ``tmp``,
+    with the expiry summary built so the listeners maintain it.
+    """
+    session = open_database(os.path.join(tmp, name))
+    try:
+        rebuild(session.connection(), today)
+        session.commit()
+        yield session
+    finally:
+        session.close()
+        session.get_bind().dispose()
+
+
+def run_checks():
+    with tempfile.TemporaryDirectory() as tmp:
+        # A copy, so the checks never write to the configured database (the
+        # summary check may roll it forward).
+        path = os.path.join(tmp, "copy.db")
+        if os.path.exists(DB_PATH):
+            copy_database(DB_PATH, path)
+        session = open_database(path)
+        try:
+            check_query_plans(session)
+            check_status_expressions(session)
+            check_records()
+            check_fingerprints()
+            check_expiry_summary(session)
+        finally:
+            session.close()
+            session.get_bind().dispose()
+
+        with scratch_database(tmp, "summary.db") as session:
+            check_summary_listeners(session)
+        with scratch_database(tmp, "dedupe.db") as session:
+            check_dedupe(session)
+        with scratch_database(tmp, "bulk.db") as session:
+            check_bulk_update(session)
+        with scratch_database(tmp, "scan.db") as session:
+            check_scan(session)
+    print("All checks passed.")
+
+
+if __name__ == "__main__":
+    run_checks()
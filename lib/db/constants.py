@@ -0,0 +1,16 @@
+"""
+Settings shared by the models, queries and command-line parsers. This
+module imports nothing heavy so argument parsing can use it before
+SQLAlchemy is loaded.
+"""
+
+# Certifications expiring within this many days are reported as "Expiring Soon".
+EXPIRING_SOON_DAYS = 30
+
+# Command-line spellings of the certification status labels.
+STATUS_SLUGS = {
+    "valid": "Valid",
+    "expiring-soon": "Expiring Soon",
+    "expired": "Expired",
+    "no-expiry": "No Expiry",
+}
@@ -0,0 +1,82 @@
+"""
+Fingerprints of normalized names and titles, for finding duplicates.
+
+A fingerprint is a signed 64-bit hash of its parts after normalization:
+Unicode compatibility forms folded, accents dropped, case folded, and runs
+of punctuation and whitespace reduced to one space. "Moringa School",
+"moringa-school." and "MORINGA  SCHOOL" share one. The models store it in
+an indexed ``fingerprint`` column next to the scope it is unique within,
+so duplicates are the groups of one GROUP BY over that index:
+
+    institutions    name                  (across all institutions)
+    courses         name                  within an institution
+    certifications  title and level       within a course
+
+Inserts fill the column through its default, ORM updates through the
+models' validators, and set-based updates through the ``fingerprint()``
+SQL function that every storage connection registers.
+"""
+
+import functools
+import hashlib
+import re
+import unicodedata
+
+# The models' source columns for each table's fingerprint.
+SOURCES = {
+    "institutions": ("name",),
+    "courses": ("name",),
+    "certifications": ("title", "level"),
+}
+
+_SEPARATORS = re.compile(r"[\W_]+")
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+
+
+def normalize(text):
+    """``text`` folded for comparison; None becomes the empty string."""
+    if text is None:
+        return ""
+    text = str(text)
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return _SEPARATORS.sub(" ", text.casefold()).strip()
+
+
+# Names and titles repeat across rows, so most lookups during a fill or an
+# import are cache hits.
+@functools.lru_cache(maxsize=16384)
+def fingerprint(*parts):
+    """Signed 64-bit hash of the normalized ``parts``."""
+    key = "\x1f".join(normalize(part) for part in parts).encode()
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def default_for(*columns):
+    """Column default computing the fingerprint of ``columns`` on insert."""
+
+    def default(context):
+        values = context.get_current_parameters()
+        return fingerprint(*(values.get(column) for column in columns))
+
+    return default
+
+
+def register(dbapi_connection):
+    """Make ``fingerprint(...)`` callable from SQL on ``dbapi_connection``."""
+    dbapi_connection.create_function("fingerprint", -1, fingerprint, deterministic=True)
+
+
+def fill(connection):
+    """
+    Compute the fingerprints that are missing, e.g. after the migration that
+    added the columns. Returns the number of rows filled.
+    """
+    filled = 0
+    for table, columns in SOURCES.items():
+        filled += connection.exec_driver_sql(
+            f"UPDATE {table} SET fingerprint = fingerprint({', '.join(columns)}) "
+            "WHERE fingerprint IS NULL"
+        ).rowcount
+    return filled
@@ -0,0 +1,162 @@
+"""
+Generate a synthetic tracker database for load testing and benchmarks.
+
+The data goes to a separate SQLite file, never the tracker's own database.
+
+Usage:
+    python -m lib.db.generate bench.db
+    python -m lib.db.generate big.db --institutions 1000 --courses 100000 \\
+        --certifications 5000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, event
+from lib.db import summary
+from lib.db.changes import create_change_triggers
+from lib.db.search import create_search_index
+from lib.db.models import DB_PATH, Base, Institution, Course, Certification
+
+# Rows per executemany call.
+CHUNK_SIZE = 50_000
+
+LEVELS = ["Foundation", "Associate", "Professional", "Expert", None]
+TYPES = ["University", "Bootcamp", "College", "Online Academy", None]
+CITIES = ["Nairobi", "Mombasa", "Kisumu", "Kampala", "Lagos", "Accra", None]
+SUBJECTS = [
+    "Data Science",
+    "Software Engineering",
+    "Cloud Computing",
+    "Cyber Security",
+    "AI Fundamentals",
+    "Product Design",
+    "DevOps",
+    "Networking",
+]
+DURATIONS = ["6 weeks", "3 months", "6 months", "12 months", "1 semester", None]
+
+
+def random_expiry(rng, today):
+    """
+    (issue_date, expiry_date) spread like a real register: issues over the
+    last five years, one to three years of validity, 10% without expiry.
+    That leaves roughly half expired, a small share expiring within 30
+    days and the rest valid.
+    """
+    issue = today - timedelta(days=rng.randint(0, 5 * 365))
+    if rng.random() < 0.10:
+        return issue, None
+    return issue, issue + timedelta(days=365 * rng.randint(1, 3) + rng.randint(-30, 30))
+
+
+def _certification_rows(rng, courses, count, today):
+    for i in range(1, count + 1):
+        issue, expiry = random_expiry(rng, today)
+        yield {
+            "id": i,
+            "course_id": rng.randint(1, courses),
+            "title": f"{rng.choice(SUBJECTS)} Certificate {i}",
+            "level": rng.choice(LEVELS),
+            "issue_date": issue,
+            "expiry_date": expiry,
+        }
+
+
+def _insert_chunks(conn, table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            conn.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(table.insert(), chunk)
+
+
+def generate(path, institutions, courses, certifications, seed=0, today=None):
+    """Create ``path`` and fill it with the requested number of rows."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    engine = create_engine(f"sqlite:///{path}", future=True)
+
+    @event.listens_for(engine, "connect")
+    def _fast_load(dbapi_conn, _):
+        # A generated database is disposable, so skip durability while loading.
+        dbapi_conn.execute("PRAGMA journal_mode=OFF")
+        dbapi_conn.execute("PRAGMA synchronous=OFF")
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _insert_chunks(
+            conn,
+            Institution.__table__,
+            (
+                {
+                    "id": i,
+                    "name": f"Institution {i:05d}",
+                    "location": rng.choice(CITIES),
+                    "year": rng.randint(1950, today.year),
+                    "type": rng.choice(TYPES),
+                }
+                for i in range(1, institutions + 1)
+            ),
+        )
+        _insert_chunks(
+            conn,
+            Course.__table__,
+            (
+                {
+                    "id": i,
+                    "institution_id": rng.randint(1, institutions),
+                    "name": f"{rng.choice(SUBJECTS)} {i:06d}",
+                    "description": f"Synthetic course {i}",
+                    "duration": rng.choice(DURATIONS),
+                }
+                for i in range(1, courses + 1)
+            ),
+        )
+        _insert_chunks(
+            conn,
+            Certification.__table__,
+            _certification_rows(rng, courses, certifications, today),
+        )
+        summary.rebuild(conn, today)
+        create_search_index(conn)
+        # The generated rows are the starting state, not changes.
+        create_change_triggers(conn)
+    engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic database.")
+    parser.add_argument("path", help="SQLite file to create")
+    parser.add_argument("--institutions", type=int, default=100)
+    parser.add_argument("--courses", type=int, default=5_000)
+    parser.add_argument("--certifications", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="replace an existing file")
+    args = parser.parse_args(argv)
+
+    if args.institutions < 1 or args.courses < 1:
+        parser.error("--institutions and --courses must be at least 1")
+    if os.path.abspath(args.path) == DB_PATH:
+        parser.error("refusing to overwrite the tracker database")
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f"{args.path} exists; pass --force to replace it")
+        os.remove(args.path)
+
+    start = time.perf_counter()
+    generate(args.path, args.institutions, args.courses, args.certifications, args.seed)
+    elapsed = time.perf_counter() - start
+    total = args.institutions + args.courses + args.certifications
+    print(f"Wrote {total:,} rows to {args.path} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
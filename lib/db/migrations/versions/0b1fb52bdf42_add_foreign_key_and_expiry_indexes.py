@@ -0,0 +1,43 @@
+"""add foreign key and expiry indexes
+
+Revision ID: 0b1fb52bdf42
+Revises: 99480ccd3e4b
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b1fb52bdf42'
+down_revision: Union[str, Sequence[str], None] = '99480ccd3e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_courses_institution_id', 'courses', ['institution_id'], unique=False
+    )
+    op.create_index(
+        'ix_certifications_course_id_expiry_date',
+        'certifications',
+        ['course_id', 'expiry_date'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_certifications_expiry_date', 'certifications', ['expiry_date'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_certifications_expiry_date', table_name='certifications')
+    op.drop_index(
+        'ix_certifications_course_id_expiry_date', table_name='certifications'
+    )
+    op.drop_index('ix_courses_institution_id', table_name='courses')
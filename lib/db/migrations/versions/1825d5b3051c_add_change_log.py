@@ -0,0 +1,61 @@
+"""add change log
+
+Revision ID: 1825d5b3051c
+Revises: cac497427083
+Create Date: 2026-10-18 16:26:22.273885
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1825d5b3051c'
+down_revision: Union[str, Sequence[str], None] = 'cac497427083'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['institutions', 'courses', 'certifications']
+
+# (trigger suffix, event, op, row alias holding the id)
+EVENTS = [
+    ('ai', 'INSERT', 'insert', 'new'),
+    ('au', 'UPDATE', 'update', 'new'),
+    ('ad', 'DELETE', 'delete', 'old'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows that already exist are not logged; consumers start from a full export.
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_change_log_table_name_row_id_seq', 'change_log', ['table_name', 'row_id', 'seq'], unique=False)
+    for table in TABLES:
+        for suffix, event, op_name, alias in EVENTS:
+            op.execute(
+                f"""
+                CREATE TRIGGER change_log_{table}_{suffix} AFTER {event} ON {table} BEGIN
+                    INSERT INTO change_log(table_name, row_id, op)
+                    VALUES ('{table}', {alias}.id, '{op_name}');
+                END
+                """
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for suffix, *_ in EVENTS:
+            op.execute(f'DROP TRIGGER IF EXISTS change_log_{table}_{suffix}')
+    op.drop_index('ix_change_log_table_name_row_id_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,62 @@
+"""add fingerprints
+
+Revision ID: 7bee8098e5d5
+Revises: 1825d5b3051c
+Create Date: 2026-10-18 16:34:02.422528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7bee8098e5d5'
+down_revision: Union[str, Sequence[str], None] = '1825d5b3051c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns whose updates are logged: all but the derived fingerprint.
+LOGGED_COLUMNS = {
+    'institutions': 'id, name, location, year, type',
+    'courses': 'id, institution_id, name, description, duration',
+    'certifications': 'id, course_id, title, level, issue_date, expiry_date',
+}
+
+
+def _replace_update_trigger(table, event):
+    op.execute(f'DROP TRIGGER IF EXISTS change_log_{table}_au')
+    op.execute(
+        f"""
+        CREATE TRIGGER change_log_{table}_au AFTER {event} ON {table} BEGIN
+            INSERT INTO change_log(table_name, row_id, op)
+            VALUES ('{table}', new.id, 'update');
+        END
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by init_db() on the next start (lib.db.fingerprints.fill).
+    op.add_column('certifications', sa.Column('fingerprint', sa.Integer(), nullable=True))
+    op.create_index('ix_certifications_course_id_fingerprint', 'certifications', ['course_id', 'fingerprint'], unique=False)
+    op.add_column('courses', sa.Column('fingerprint', sa.Integer(), nullable=True))
+    op.create_index('ix_courses_institution_id_fingerprint', 'courses', ['institution_id', 'fingerprint'], unique=False)
+    op.add_column('institutions', sa.Column('fingerprint', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_institutions_fingerprint'), 'institutions', ['fingerprint'], unique=False)
+    for table, columns in LOGGED_COLUMNS.items():
+        _replace_update_trigger(table, f'UPDATE OF {columns}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in LOGGED_COLUMNS:
+        _replace_update_trigger(table, 'UPDATE')
+    op.drop_index(op.f('ix_institutions_fingerprint'), table_name='institutions')
+    op.drop_column('institutions', 'fingerprint')
+    op.drop_index('ix_courses_institution_id_fingerprint', table_name='courses')
+    op.drop_column('courses', 'fingerprint')
+    op.drop_index('ix_certifications_course_id_fingerprint', table_name='certifications')
+    op.drop_column('certifications', 'fingerprint')
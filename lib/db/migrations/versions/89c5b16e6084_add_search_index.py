@@ -0,0 +1,146 @@
+"""add search index
+
+Revision ID: 89c5b16e6084
+Revises: d86571273506
+Create Date: 2026-10-18 14:08:52.130477
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89c5b16e6084'
+down_revision: Union[str, Sequence[str], None] = 'd86571273506'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = [
+    'search_institutions_ai',
+    'search_institutions_au',
+    'search_institutions_ad',
+    'search_courses_ai',
+    'search_courses_au',
+    'search_courses_ad',
+    'search_certifications_ai',
+    'search_certifications_au',
+    'search_certifications_ad',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 table kept in sync by triggers; rowid = source id * 4 + kind code.
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            kind UNINDEXED,
+            ref_id UNINDEXED,
+            title,
+            body,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO search_index(search_index, rank) VALUES('rank', 'bm25(0, 0, 10.0, 1.0)')
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_institutions_ai AFTER INSERT ON institutions BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, title, body)
+            VALUES (new.id * 4 + 1, 'institution', new.id, new.name, '');
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_institutions_au AFTER UPDATE OF name ON institutions BEGIN
+            UPDATE search_index SET title = new.name WHERE rowid = old.id * 4 + 1;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_institutions_ad AFTER DELETE ON institutions BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_courses_ai AFTER INSERT ON courses BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, title, body)
+            VALUES (new.id * 4 + 2, 'course', new.id, new.name, coalesce(new.description, ''));
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_courses_au AFTER UPDATE OF name, description ON courses BEGIN
+            UPDATE search_index
+            SET title = new.name, body = coalesce(new.description, '')
+            WHERE rowid = old.id * 4 + 2;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_courses_ad AFTER DELETE ON courses BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_certifications_ai AFTER INSERT ON certifications BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, title, body)
+            VALUES (new.id * 4 + 3, 'certification', new.id, new.title, '');
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_certifications_au AFTER UPDATE OF title ON certifications BEGIN
+            UPDATE search_index SET title = new.title WHERE rowid = old.id * 4 + 3;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER search_certifications_ad AFTER DELETE ON certifications BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        END
+        """
+    )
+    # Index the rows that already exist.
+    op.execute(
+        """
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        SELECT id * 4 + 1, 'institution', id, name, '' FROM institutions
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        SELECT id * 4 + 2, 'course', id, name, coalesce(description, '') FROM courses
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        SELECT id * 4 + 3, 'certification', id, title, '' FROM certifications
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS search_index')
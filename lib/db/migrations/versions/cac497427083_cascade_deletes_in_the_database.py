@@ -0,0 +1,72 @@
+"""cascade deletes in the database
+
+Revision ID: cac497427083
+Revises: 89c5b16e6084
+Create Date: 2026-10-18 15:57:55.760784
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cac497427083'
+down_revision: Union[str, Sequence[str], None] = '89c5b16e6084'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names the existing unnamed foreign keys so batch mode can drop them.
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+# (table, column, referred table)
+FOREIGN_KEYS = [
+    ('courses', 'institution_id', 'institutions'),
+    ('certifications', 'course_id', 'courses'),
+]
+
+
+def _saved_triggers(table):
+    """CREATE TRIGGER statements on ``table``, which a table rebuild drops."""
+    rows = op.get_bind().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+        (table,),
+    )
+    return [sql for (sql,) in rows]
+
+
+def _recreate_foreign_keys(ondelete):
+    # SQLite cannot alter a constraint, so each table is rebuilt. With
+    # foreign keys enforced, dropping the old courses table would delete
+    # every certification; this must run before the first write begins the
+    # transaction.
+    op.execute("PRAGMA foreign_keys=OFF")
+    for table, column, referred in FOREIGN_KEYS:
+        name = NAMING_CONVENTION["fk"] % {
+            "table_name": table,
+            "column_0_name": column,
+            "referred_table_name": referred,
+        }
+        triggers = _saved_triggers(table)
+        with op.batch_alter_table(
+            table, recreate="always", naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(
+                name, referred, [column], ['id'], ondelete=ondelete
+            )
+        for sql in triggers:
+            op.execute(sql)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_foreign_keys(None)
@@ -0,0 +1,34 @@
+"""add expiry summary
+
+Revision ID: d86571273506
+Revises: daba334cd9cd
+Create Date: 2026-10-18 13:21:05.671392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd86571273506'
+down_revision: Union[str, Sequence[str], None] = 'daba334cd9cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled on first read (or by `python -m lib.db.summary rebuild`).
+    op.create_table('expiry_summary',
+    sa.Column('bucket', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expiry_summary')
@@ -0,0 +1,32 @@
+"""add listing sort indexes
+
+Revision ID: daba334cd9cd
+Revises: ddb11f5c2a1e
+Create Date: 2026-10-18 10:47:53.912604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'daba334cd9cd'
+down_revision: Union[str, Sequence[str], None] = 'ddb11f5c2a1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_courses_name', 'courses', ['name'], unique=False)
+    op.create_index(
+        'ix_certifications_title', 'certifications', ['title'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_certifications_title', table_name='certifications')
+    op.drop_index('ix_courses_name', table_name='courses')
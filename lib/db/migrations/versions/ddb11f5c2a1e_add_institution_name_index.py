@@ -0,0 +1,28 @@
+"""add institution name index
+
+Revision ID: ddb11f5c2a1e
+Revises: 0b1fb52bdf42
+Create Date: 2026-10-18 10:02:17.284410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ddb11f5c2a1e'
+down_revision: Union[str, Sequence[str], None] = '0b1fb52bdf42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_institutions_name', 'institutions', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_institutions_name', table_name='institutions')
@@ -1,97 +1,333 @@
 import os
-from datetime import date
+import sys
+from datetime import date, timedelta
 from sqlalchemy import (
-    create_engine,
+    and_,
+    case,
+    cast,
+    func,
     Column,
     Integer,
     String,
     Text,
     Date,
+    DateTime,
     ForeignKey,
+    Index,
+    text,
 )
-from sqlalchemy.orm import relationship, sessionmaker, declarative_base
+from sqlalchemy.ext.hybrid import hybrid_method
+from sqlalchemy.orm import (
+    column_property,
+    relationship,
+    sessionmaker,
+    declarative_base,
+    validates,
+)
+from lib.db.constants import EXPIRING_SOON_DAYS
+from lib.db.fingerprints import default_for, fingerprint
+from lib.db.storage import create_storage_engine, load_storage_settings
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "certification_tracker.db")
+STORAGE = load_storage_settings(os.path.join(BASE_DIR, "certification_tracker.db"))
+DB_PATH = STORAGE["path"]
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(DATABASE_URL, future=True, echo=False)
+# Bump with every migration that changes the schema, and set SCHEMA_REVISION
+# to the new Alembic head. init_db() skips its create_all when the
+# database's PRAGMA user_version already matches.
+SCHEMA_VERSION = 9
+SCHEMA_REVISION = "7bee8098e5d5"
+
+engine = create_storage_engine(STORAGE, echo=False)
 SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, future=True)
 Base = declarative_base()
 
 
+def certification_status(expiry_date, today=None) -> str:
+    """Status label for a certification expiring on ``expiry_date``."""
+    if expiry_date is None:
+        return "No Expiry"
+    today = today or date.today()
+    if expiry_date < today:
+        return "Expired"
+    if (expiry_date - today).days <= EXPIRING_SOON_DAYS:
+        return "Expiring Soon"
+    return "Valid"
+
+
 class Institution(Base):
     __tablename__ = "institutions"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     location = Column(String, nullable=True)
     year = Column(Integer, nullable=True)
     type = Column(String, nullable=True)
+    fingerprint = Column(
+        Integer, nullable=True, index=True, default=default_for("name")
+    )
 
+    # The database cascades deletes (ON DELETE CASCADE), so deleting an
+    # institution does not load its courses and certifications.
     courses = relationship(
-        "Course", back_populates="institution", cascade="all, delete-orphan"
+        "Course",
+        back_populates="institution",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
+    @validates("name")
+    def _fingerprint_name(self, key, name):
+        self.fingerprint = fingerprint(name)
+        return name
+
     def __repr__(self):
         return f"<Institution {self.id}: {self.name} ({self.location or 'N/A'})>"
 
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_institution_id_fingerprint", "institution_id", "fingerprint"),
+    )
 
     id = Column(Integer, primary_key=True)
-    institution_id = Column(Integer, ForeignKey("institutions.id"), nullable=False)
-    name = Column(String, nullable=False)
+    institution_id = Column(
+        Integer,
+        ForeignKey("institutions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=True)
     duration = Column(String, nullable=True)
+    fingerprint = Column(Integer, nullable=True, default=default_for("name"))
 
     institution = relationship("Institution", back_populates="courses")
     certifications = relationship(
-        "Certification", back_populates="course", cascade="all, delete-orphan"
+        "Certification",
+        back_populates="course",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
+    @validates("name")
+    def _fingerprint_name(self, key, name):
+        self.fingerprint = fingerprint(name)
+        return name
+
     def __repr__(self):
         return f"<Course {self.id}: {self.name}>"
 
 
 class Certification(Base):
     __tablename__ = "certifications"
+    __table_args__ = (
+        # Leading course_id serves the foreign key; expiry_date orders each
+        # course's certificates and makes per-course status counts index-only.
+        Index("ix_certifications_course_id_expiry_date", "course_id", "expiry_date"),
+        # Duplicates within a course share a fingerprint; see lib.dedupe.
+        Index("ix_certifications_course_id_fingerprint", "course_id", "fingerprint"),
+    )
 
     id = Column(Integer, primary_key=True)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
-    title = Column(String, nullable=False)
+    course_id = Column(
+        Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False
+    )
+    title = Column(String, nullable=False, index=True)
     level = Column(String, nullable=True)
     issue_date = Column(Date, nullable=True)
-    expiry_date = Column(Date, nullable=True)
+    # Active history loads the old value before it is replaced, so the
+    # expiry summary listener always knows which bucket to uncount.
+    expiry_date = column_property(
+        Column(Date, nullable=True, index=True), active_history=True
+    )
+    fingerprint = Column(Integer, nullable=True, default=default_for("title", "level"))
 
     course = relationship("Course", back_populates="certifications")
 
+    @validates("title", "level")
+    def _fingerprint_title(self, key, value):
+        values = {"title": self.title, "level": self.level, key: value}
+        self.fingerprint = fingerprint(values["title"], values["level"])
+        return value
+
+    # The *_on methods take an explicit reference date and work both on
+    # instances and as SQL expressions, e.g.
+    #   select(Certification.status_on(as_of), func.count()).group_by(...)
+
+    @hybrid_method
+    def is_expired_on(self, as_of) -> bool:
+        return bool(self.expiry_date and self.expiry_date < as_of)
+
+    @is_expired_on.expression
+    def is_expired_on(cls, as_of):
+        return and_(cls.expiry_date.is_not(None), cls.expiry_date < as_of)
+
+    @hybrid_method
+    def days_to_expiry_on(self, as_of):
+        if not self.expiry_date:
+            return None
+        return (self.expiry_date - as_of).days
+
+    @days_to_expiry_on.expression
+    def days_to_expiry_on(cls, as_of):
+        return cast(func.julianday(cls.expiry_date) - func.julianday(as_of), Integer)
+
+    @hybrid_method
+    def status_on(self, as_of) -> str:
+        return certification_status(self.expiry_date, as_of)
+
+    @status_on.expression
+    def status_on(cls, as_of):
+        soon = as_of + timedelta(days=EXPIRING_SOON_DAYS)
+        return case(
+            (cls.expiry_date.is_(None), "No Expiry"),
+            (cls.expiry_date < as_of, "Expired"),
+            (cls.expiry_date <= soon, "Expiring Soon"),
+            else_="Valid",
+        )
+
     @property
     def is_expired(self) -> bool:
-        return bool(self.expiry_date and self.expiry_date < date.today())
+        return self.is_expired_on(date.today())
 
     @property
     def days_to_expiry(self):
-        if not self.expiry_date:
-            return None
-        return (self.expiry_date - date.today()).days
+        return self.days_to_expiry_on(date.today())
 
     @property
     def status(self) -> str:
-        if self.expiry_date is None:
-            return "No Expiry"
-        if self.is_expired:
-            return "Expired"
-        days = self.days_to_expiry
-        if days is not None and days <= 30:
-            return "Expiring Soon"
-        return "Valid"
+        return self.status_on(date.today())
 
     def __repr__(self):
         return f"<Certification {self.id}: {self.title} ({self.status})>"
 
 
+class ExpirySummary(Base):
+    """
+    Certification counts per expiry bucket relative to ``as_of``, kept
+    current by the listeners in ``lib.db.summary``.
+    """
+
+    __tablename__ = "expiry_summary"
+
+    bucket = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    as_of = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<ExpirySummary {self.bucket}: {self.count} as of {self.as_of}>"
+
+
+class ChangeLog(Base):
+    """
+    One row per insert, update or delete on institutions, courses and
+    certifications, written by the triggers in ``lib.db.changes``.
+    """
+
+    __tablename__ = "change_log"
+    # AUTOINCREMENT so a sequence number is never reused after compaction.
+    __table_args__ = (
+        Index("ix_change_log_table_name_row_id_seq", "table_name", "row_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    changed_at = Column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+
+    def __repr__(self):
+        return f"<ChangeLog {self.seq}: {self.op} {self.table_name} {self.row_id}>"
+
+
 def init_db():
-    """Create tables if they do not exist."""
-    Base.metadata.create_all(bind=engine)
+    """
+    Create missing tables and the search index, then stamp the database
+    with SCHEMA_VERSION. A database already at that version is left alone,
+    so startup costs one PRAGMA read instead of a check per table.
+    """
+    with engine.begin() as connection:
+        ensure_schema(connection)
+
+
+def ensure_schema(connection):
+    """The body of init_db(), for a connection already in a transaction."""
+    from lib.db.changes import create_change_triggers
+    from lib.db.fingerprints import fill
+    from lib.db.search import create_search_index
+
+    version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    if version == SCHEMA_VERSION:
+        return
+    problems = schema_problems(connection)
+    if problems:
+        sys.exit(
+            "The database schema is out of date:\n  "
+            + "\n  ".join(problems)
+            + "\nRun `alembic upgrade head` in lib/db, then try again."
+        )
+    Base.metadata.create_all(bind=connection)
+    create_search_index(connection)
+    create_change_triggers(connection)
+    fill(connection)
+    connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def schema_problems(connection):
+    """
+    What a migration must fix before create_all can complete the schema:
+    an older Alembic revision, and missing columns, indexes or ON DELETE
+    actions on existing tables, which create_all leaves alone.
+    """
+    problems = []
+    existing = set(
+        connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).scalars()
+    )
+    if "alembic_version" in existing:
+        revision = connection.exec_driver_sql(
+            "SELECT version_num FROM alembic_version"
+        ).scalar()
+        if revision != SCHEMA_REVISION:
+            problems.append(f"revision {revision}, expected {SCHEMA_REVISION}")
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        pragma = connection.exec_driver_sql
+        columns = {row[1] for row in pragma(f"PRAGMA table_info({table.name})")}
+        for column in table.columns:
+            if column.name not in columns:
+                problems.append(f"column {table.name}.{column.name} is missing")
+        indexes = {row[1] for row in pragma(f"PRAGMA index_list({table.name})")}
+        for index in table.indexes:
+            if index.name not in indexes:
+                problems.append(f"index {index.name} is missing")
+        actions = {
+            row[3]: row[6] for row in pragma(f"PRAGMA foreign_key_list({table.name})")
+        }
+        for key in table.foreign_keys:
+            expected = (key.ondelete or "NO ACTION").upper()
+            actual = actions.get(key.parent.name, "no foreign key")
+            if actual != expected:
+                problems.append(
+                    f"{table.name}.{key.parent.name} ON DELETE is {actual}, "
+                    f"expected {expected}"
+                )
+    if problems and "alembic_version" not in existing:
+        # Created by init_db() before migrations were used.
+        problems.append(
+            "no Alembic revision; first run `alembic stamp 99480ccd3e4b` "
+            "(the initial tables)"
+        )
+    return problems
+
+
+# Registers the ORM listeners that maintain ExpirySummary.
+import lib.db.summary  # noqa: E402,F401
@@ -0,0 +1,263 @@
+import os
+from collections import namedtuple
+from datetime import date, timedelta
+from sqlalchemy import and_, func, select, tuple_
+from lib.db.constants import EXPIRING_SOON_DAYS, STATUS_SLUGS
+from lib.db.models import Institution, Course, Certification
+
+# Rows fetched per round trip when a report streams its results.
+STREAM_BATCH = 1000
+
+# Rows shown per screen by the paginated listings.
+PAGE_SIZE = int(os.environ.get("TRACKER_PAGE_SIZE", "20"))
+
+# ``first``/``last`` are the (sort key, id) cursors of the page's edge rows.
+Page = namedtuple("Page", "rows first last has_prev has_next")
+
+
+def certifications_by_institution():
+    """
+    Select every institution with its courses and their certifications as
+    flat rows, ordered so consecutive rows can be grouped. Institutions
+    without courses and courses without certifications yield NULL columns.
+    The order follows the indexes, so rows stream without a sort step.
+    """
+    return (
+        select(
+            Institution.id.label("institution_id"),
+            Institution.name.label("institution_name"),
+            Course.id.label("course_id"),
+            Course.name.label("course_name"),
+            Certification.title,
+            Certification.expiry_date,
+        )
+        .outerjoin(Course, Course.institution_id == Institution.id)
+        .outerjoin(Certification, Certification.course_id == Course.id)
+        .order_by(
+            Institution.name,
+            Institution.id,
+            Course.id,
+            Certification.expiry_date,
+            Certification.id,
+        )
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+
+def keyset_select(stmt, sort_col, id_col, page_size=PAGE_SIZE, after=None, before=None):
+    """Narrow ``stmt`` to the page after/before a (sort key, id) cursor."""
+    cursor = tuple_(sort_col, id_col)
+    if before is not None:
+        stmt = stmt.where(cursor < tuple_(*before))
+        stmt = stmt.order_by(sort_col.desc(), id_col.desc())
+    else:
+        if after is not None:
+            stmt = stmt.where(cursor > tuple_(*after))
+        stmt = stmt.order_by(sort_col, id_col)
+    # One extra row tells us whether another page exists.
+    return stmt.limit(page_size + 1)
+
+
+def keyset_page(
+    session, stmt, sort_col, id_col, page_size=PAGE_SIZE, after=None, before=None
+):
+    """
+    Fetch one page of ``stmt`` ordered by (``sort_col``, ``id_col``).
+
+    Pass the ``last`` cursor of a page as ``after`` for the next page, or its
+    ``first`` cursor as ``before`` for the previous one. Each page is a single
+    query that seeks on the cursor instead of skipping rows with OFFSET.
+    """
+    stmt = keyset_select(stmt, sort_col, id_col, page_size, after, before)
+    rows = session.execute(stmt).all()
+    return make_page(rows, sort_col, id_col, page_size, after, before)
+
+
+def make_page(rows, sort_col, id_col, page_size=PAGE_SIZE, after=None, before=None):
+    """Build a Page from the rows of the matching ``keyset_select``."""
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before is not None:
+        rows.reverse()
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = after is not None, more
+
+    def key(row):
+        return (getattr(row, sort_col.key), getattr(row, id_col.key))
+
+    first, last = (key(rows[0]), key(rows[-1])) if rows else (None, None)
+    return Page(rows, first, last, has_prev, has_next)
+
+
+def prefix_matches(sort_col, id_col, prefix, limit):
+    """
+    Up to ``limit`` (id, name) rows whose ``sort_col`` starts with
+    ``prefix`` (case-sensitive), as a range seek on the column's index.
+    """
+    return (
+        select(id_col, sort_col)
+        .where(sort_col >= prefix, sort_col < prefix + "\U0010ffff")
+        .order_by(sort_col, id_col)
+        .limit(limit)
+    )
+
+
+def institutions_listing():
+    """Institution rows for ``keyset_page``, sorted by name."""
+    stmt = select(
+        Institution.id,
+        Institution.name,
+        Institution.location,
+        Institution.year,
+        Institution.type,
+    )
+    return stmt, Institution.name, Institution.id
+
+
+def courses_listing():
+    """Course rows with their institution name, sorted by course name."""
+    stmt = select(
+        Course.id,
+        Course.name,
+        Course.description,
+        Course.duration,
+        Institution.name.label("institution_name"),
+    ).join(Institution, Course.institution_id == Institution.id)
+    return stmt, Course.name, Course.id
+
+
+def certifications_listing():
+    """Certification rows with course and institution names, sorted by title."""
+    stmt = (
+        select(
+            Certification.id,
+            Certification.title,
+            Certification.level,
+            Certification.issue_date,
+            Certification.expiry_date,
+            Course.name.label("course_name"),
+            Institution.name.label("institution_name"),
+        )
+        .join(Course, Certification.course_id == Course.id)
+        .join(Institution, Course.institution_id == Institution.id)
+    )
+    return stmt, Certification.title, Certification.id
+
+
+def expiring_listing(days=EXPIRING_SOON_DAYS, today=None):
+    """
+    Certifications that are expired or expire within ``days`` of ``today``,
+    with course and institution names, soonest first, fetched in chunks of
+    ``STREAM_BATCH``.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=days)
+    stmt, _, _ = certifications_listing()
+    return (
+        stmt.where(Certification.expiry_date.is_not(None))
+        .where(Certification.expiry_date <= horizon)
+        .order_by(Certification.expiry_date, Certification.id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+
+def status_filter(status, today=None):
+    """
+    SQL predicate matching certifications whose ``certification_status`` is
+    ``status`` on ``today``. Equivalent to ``Certification.status_on(today)
+    == status``, but written as date ranges so it can use the expiry index.
+    """
+    today = today or date.today()
+    soon = today + timedelta(days=EXPIRING_SOON_DAYS)
+    expiry = Certification.expiry_date
+    if status == "No Expiry":
+        return expiry.is_(None)
+    if status == "Expired":
+        return expiry < today
+    if status == "Expiring Soon":
+        return and_(expiry >= today, expiry <= soon)
+    if status == "Valid":
+        return expiry > soon
+    raise ValueError(f"Unknown status: {status}")
+
+
+def status_rollup(today=None):
+    """
+    Certification counts per status for every course, with its institution,
+    from one grouped query. Columns are named after ``STATUS_SLUGS`` (with
+    underscores) plus ``total``; courses without certifications are omitted.
+    """
+    today = today or date.today()
+    counts = [
+        func.count().filter(status_filter(status, today)).label(slug.replace("-", "_"))
+        for slug, status in STATUS_SLUGS.items()
+    ]
+    return (
+        select(
+            Institution.id.label("institution_id"),
+            Institution.name.label("institution_name"),
+            Course.id.label("course_id"),
+            Course.name.label("course_name"),
+            *counts,
+            func.count().label("total"),
+        )
+        .join(Course, Course.institution_id == Institution.id)
+        .join(Certification, Certification.course_id == Course.id)
+        .group_by(Institution.id, Course.id)
+        .order_by(Institution.name, Institution.id, Course.id)
+    )
+
+
+def certifications_export(
+    status=None, institution=None, expires_from=None, expires_to=None, today=None
+):
+    """
+    Certifications joined with course and institution names, in id order,
+    optionally narrowed by status, institution name and an expiry window.
+    Rows are fetched in chunks of ``STREAM_BATCH`` while iterating.
+    """
+    stmt, _, _ = certifications_listing()
+    stmt = stmt.order_by(Certification.id).execution_options(yield_per=STREAM_BATCH)
+    if status is not None:
+        stmt = stmt.where(status_filter(status, today))
+    if institution is not None:
+        stmt = stmt.where(Institution.name == institution)
+    if expires_from is not None:
+        stmt = stmt.where(Certification.expiry_date >= expires_from)
+    if expires_to is not None:
+        stmt = stmt.where(Certification.expiry_date <= expires_to)
+    return stmt
+
+
+def certification_filter(
+    institution=None,
+    course=None,
+    level=None,
+    status=None,
+    expires_from=None,
+    expires_to=None,
+    today=None,
+):
+    """
+    Predicates on the certifications table alone, for bulk UPDATEs, which
+    cannot join. Institution and course are matched by exact name through
+    subqueries on the course id index.
+    """
+    criteria = []
+    if institution is not None or course is not None:
+        courses = select(Course.id)
+        if institution is not None:
+            courses = courses.join(Institution).where(Institution.name == institution)
+        if course is not None:
+            courses = courses.where(Course.name == course)
+        criteria.append(Certification.course_id.in_(courses))
+    if level is not None:
+        criteria.append(Certification.level == level)
+    if status is not None:
+        criteria.append(status_filter(status, today))
+    if expires_from is not None:
+        criteria.append(Certification.expiry_date >= expires_from)
+    if expires_to is not None:
+        criteria.append(Certification.expiry_date <= expires_to)
+    return criteria
@@ -0,0 +1,106 @@
+"""
+Read models for the listings and reports: namedtuple records built from
+the column-only queries in ``lib.db.queries``, with the certification
+status computed once per row.
+
+Records are plain tuples. Unlike ORM instances they have no identity-map
+entry, instance state or lazy loaders, so a report can stream any number
+of them in constant memory and a screen can keep a page of them after its
+session has closed.
+
+Each record's fields are the columns of its query, in order, plus a
+trailing ``status`` where the record has one. ``lib.db.checks`` asserts
+that they stay in step.
+"""
+
+from collections import namedtuple
+from datetime import date, timedelta
+from lib.db.constants import EXPIRING_SOON_DAYS, STATUS_SLUGS
+from lib.db.queries import PAGE_SIZE, keyset_page
+
+InstitutionRecord = namedtuple("InstitutionRecord", "id name location year type")
+
+CourseRecord = namedtuple(
+    "CourseRecord", "id name description duration institution_name"
+)
+
+CertificationRecord = namedtuple(
+    "CertificationRecord",
+    "id title level issue_date expiry_date course_name institution_name status",
+)
+
+# A row of the by-institution report; course and certification columns are
+# None for institutions without courses and courses without certifications.
+InstitutionReportRecord = namedtuple(
+    "InstitutionReportRecord",
+    "institution_id institution_name course_id course_name title expiry_date status",
+)
+
+StatusRecord = namedtuple(
+    "StatusRecord",
+    [
+        "institution_id",
+        "institution_name",
+        "course_id",
+        "course_name",
+        *(slug.replace("-", "_") for slug in STATUS_SLUGS),
+        "total",
+    ],
+)
+
+
+def status_classifier(today=None):
+    """
+    ``certification_status`` for a fixed ``today``, with the date
+    thresholds computed once instead of for every row.
+    """
+    today = today or date.today()
+    soon = today + timedelta(days=EXPIRING_SOON_DAYS)
+
+    def status(expiry_date):
+        if expiry_date is None:
+            return "No Expiry"
+        if expiry_date < today:
+            return "Expired"
+        if expiry_date <= soon:
+            return "Expiring Soon"
+        return "Valid"
+
+    return status
+
+
+def to_records(rows, record_type, today=None):
+    """
+    Yield a ``record_type`` for each of ``rows``. A ``status`` field is
+    computed from ``expiry_date`` as of ``today``, or None for outer-joined
+    rows without a certification.
+    """
+    make = record_type._make
+    if "status" not in record_type._fields:
+        yield from map(make, rows)
+        return
+    status = status_classifier(today)
+    fields = record_type._fields
+    expiry, title = fields.index("expiry_date"), fields.index("title")
+    for row in rows:
+        yield make((*row, status(row[expiry]) if row[title] is not None else None))
+
+
+def records_page(
+    session,
+    listing,
+    record_type,
+    page_size=PAGE_SIZE,
+    after=None,
+    before=None,
+    today=None,
+):
+    """``keyset_page`` for a ``*_listing()`` tuple, with records as rows."""
+    stmt, sort_col, id_col = listing
+    page = keyset_page(session, stmt, sort_col, id_col, page_size, after, before)
+    return page._replace(rows=list(to_records(page.rows, record_type, today)))
+
+
+def stream_records(session, stmt, record_type, today=None):
+    """Records for a streaming report query, fetched in chunks."""
+    return to_records(session.execute(stmt), record_type, today)
@@ -0,0 +1,241 @@
+"""
+Full-text search over institution names, course names and descriptions,
+and certification titles, backed by an SQLite FTS5 table.
+
+``search_index`` holds one row per institution, course and certification.
+Each row's rowid is derived from the source id (``id * 4 + kind code``) so
+the sync triggers can update and delete by rowid. Results are ranked with
+BM25, weighting names and titles above descriptions.
+"""
+
+import re
+from sqlalchemy import func, select, text
+from lib.db.models import Institution, Course, Certification
+
+# Upper bound on the number of matches of each kind scored for ranking.
+RANKED_CANDIDATES = 1000
+
+# BM25 column weights: kind, ref_id, title, body.
+BM25_WEIGHTS = "0, 0, 10.0, 1.0"
+
+# kind: (rowid code, model); search_index rowids are ``id * 4 + code``.
+KINDS = {
+    "institution": (1, Institution),
+    "course": (2, Course),
+    "certification": (3, Certification),
+}
+
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE search_index USING fts5(
+        kind UNINDEXED,
+        ref_id UNINDEXED,
+        title,
+        body,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    "INSERT INTO search_index(search_index, rank) "
+    f"VALUES('rank', 'bm25({BM25_WEIGHTS})')",
+    """
+    CREATE TRIGGER search_institutions_ai AFTER INSERT ON institutions BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        VALUES (new.id * 4 + 1, 'institution', new.id, new.name, '');
+    END
+    """,
+    """
+    CREATE TRIGGER search_institutions_au AFTER UPDATE OF name ON institutions BEGIN
+        UPDATE search_index SET title = new.name WHERE rowid = old.id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER search_institutions_ad AFTER DELETE ON institutions BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER search_courses_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        VALUES (new.id * 4 + 2, 'course', new.id, new.name, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER search_courses_au AFTER UPDATE OF name, description ON courses BEGIN
+        UPDATE search_index
+        SET title = new.name, body = coalesce(new.description, '')
+        WHERE rowid = old.id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER search_courses_ad AFTER DELETE ON courses BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER search_certifications_ai AFTER INSERT ON certifications BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, title, body)
+        VALUES (new.id * 4 + 3, 'certification', new.id, new.title, '');
+    END
+    """,
+    """
+    CREATE TRIGGER search_certifications_au AFTER UPDATE OF title ON certifications BEGIN
+        UPDATE search_index SET title = new.title WHERE rowid = old.id * 4 + 3;
+    END
+    """,
+    """
+    CREATE TRIGGER search_certifications_ad AFTER DELETE ON certifications BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END
+    """,
+]
+
+# Indexes the rows that existed before the triggers.
+POPULATE_SQL = [
+    """
+    INSERT INTO search_index(rowid, kind, ref_id, title, body)
+    SELECT id * 4 + 1, 'institution', id, name, '' FROM institutions
+    """,
+    """
+    INSERT INTO search_index(rowid, kind, ref_id, title, body)
+    SELECT id * 4 + 2, 'course', id, name, coalesce(description, '') FROM courses
+    """,
+    """
+    INSERT INTO search_index(rowid, kind, ref_id, title, body)
+    SELECT id * 4 + 3, 'certification', id, title, '' FROM certifications
+    """,
+]
+
+
+def create_search_index(connection):
+    """Create and fill the search index and its triggers if it is missing."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).scalar()
+    if exists:
+        return
+    for statement in SEARCH_DDL + POPULATE_SQL:
+        connection.exec_driver_sql(statement)
+
+
+def match_expression(query, prefix=True):
+    """
+    FTS5 MATCH expression requiring every word of ``query``, as a prefix
+    unless ``prefix`` is false, e.g. ``data sci`` -> ``"data"* "sci"*``.
+    Empty if there are no words.
+    """
+    words = re.findall(r"\w+", query.lower())
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{word}"{suffix}' for word in words)
+
+
+def search(session, query, limit=20, kind=None):
+    """
+    Best ``limit`` matches for ``query`` as rows of (kind, ref_id, title),
+    optionally restricted to one ``kind``.
+
+    Rows containing every word whole come first, then rows matching the
+    words as prefixes. Ranking candidates are capped (see ``_ranked``), and
+    the whole-word pass keeps a selective query such as an exact title from
+    losing its match to the cap when its words are also common prefixes.
+    """
+    expression = match_expression(query, prefix=False)
+    if not expression:
+        return []
+    hits = _ranked(session, expression, limit, kind)
+    if len(hits) < limit:
+        seen = {(hit.kind, hit.ref_id) for hit in hits}
+        expression = match_expression(query)
+        for hit in _ranked(session, expression, limit + len(hits), kind):
+            if (hit.kind, hit.ref_id) not in seen and len(hits) < limit:
+                hits.append(hit)
+    return hits
+
+
+def _ranked(session, expression, limit, kind=None):
+    """
+    Best ``limit`` rows matching the MATCH ``expression``.
+
+    BM25 has to score every match before the best can be picked, which is
+    slow for words that appear in a large share of the index. So each kind
+    is ranked on its own, and when it has more than ``RANKED_CANDIDATES``
+    matches only its newest that many are; the best of each are then
+    merged by rank. Certifications far outnumber institutions and courses,
+    but cannot crowd them out of the candidates.
+    """
+    params = {"q": expression, "limit": limit, "offset": RANKED_CANDIDATES - 1}
+    ranked = []
+    for name, (code, model) in KINDS.items():
+        if kind is not None and kind != name:
+            continue
+        top = session.scalar(select(func.max(model.id)))
+        if top is None:
+            continue
+        # Rows of one kind share rowid % 4, and the rowid bounds let FTS5
+        # read only the part of the index that can hold this kind's matches.
+        where = f"search_index MATCH :q AND rowid % 4 = {code} AND rowid <= :top_{name}"
+        params[f"top_{name}"] = top * 4 + code
+        if top > RANKED_CANDIDATES:
+            cap = session.execute(
+                text(
+                    f"SELECT rowid FROM search_index WHERE {where} "
+                    "ORDER BY rowid DESC LIMIT 1 OFFSET :offset"
+                ),
+                params,
+            ).scalar()
+            if cap is not None:
+                where += f" AND rowid >= :cap_{name}"
+                params[f"cap_{name}"] = cap
+        # bm25() in the select list only scores the rows the WHERE keeps;
+        # ORDER BY rank would score matches outside the rowid bounds too.
+        ranked.append(
+            "SELECT * FROM (SELECT kind, ref_id, title, "
+            f"bm25(search_index, {BM25_WEIGHTS}) AS score FROM search_index "
+            f"WHERE {where} ORDER BY score LIMIT :limit)"
+        )
+    if not ranked:
+        return []
+    return session.execute(
+        text(
+            f"SELECT kind, ref_id, title FROM ({' UNION ALL '.join(ranked)}) "
+            "ORDER BY score LIMIT :limit"
+        ),
+        params,
+    ).all()
+
+
+def hit_context(session, hits):
+    """
+    Map (kind, ref_id) of each hit to a short description of where it
+    belongs, using at most one query per kind.
+    """
+    ids = {}
+    for kind, ref_id, _ in hits:
+        ids.setdefault(kind, []).append(ref_id)
+    context = {}
+    if "certification" in ids:
+        rows = session.execute(
+            select(Certification.id, Course.name, Institution.name)
+            .join(Course, Certification.course_id == Course.id)
+            .join(Institution, Course.institution_id == Institution.id)
+            .where(Certification.id.in_(ids["certification"]))
+        )
+        for cert_id, course_name, inst_name in rows:
+            context["certification", cert_id] = f"{course_name} @ {inst_name}"
+    if "course" in ids:
+        rows = session.execute(
+            select(Course.id, Institution.name)
+            .join(Institution, Course.institution_id == Institution.id)
+            .where(Course.id.in_(ids["course"]))
+        )
+        for course_id, inst_name in rows:
+            context["course", course_id] = inst_name
+    if "institution" in ids:
+        rows = session.execute(
+            select(Institution.id, Institution.location).where(
+                Institution.id.in_(ids["institution"])
+            )
+        )
+        for inst_id, location in rows:
+            context["institution", inst_id] = location or "N/A"
+    return context
@@ -0,0 +1,110 @@
+"""
+Read-only in-memory snapshots for reporting sessions.
+
+``take()`` copies the database behind ``SessionLocal`` into an in-memory
+SQLite connection with the sqlite3 backup API, then points ``SessionLocal``
+at that copy. The backup reads the file in one read transaction, so the
+copy is consistent. Afterwards listings and reports never touch the file:
+they take no locks that would hold up writers and miss no pages on a slow
+volume.
+
+The copy is opened with ``PRAGMA query_only``, so any write fails.
+``refresh()`` copies the file again. Before each copy is locked, its expiry
+summary is rolled forward to today.
+
+Usage:
+    python main.py --snapshot
+    TRACKER_SNAPSHOT=1 python main.py
+"""
+
+import os
+import sqlite3
+import time
+from urllib.parse import quote
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from lib.db.models import SessionLocal
+from lib.db.summary import roll_forward
+
+SNAPSHOT_ENV = "TRACKER_SNAPSHOT"
+
+# The active snapshot: the in-memory connection, its engine, the source
+# file and the epoch seconds of the last copy. None outside snapshot mode.
+_snapshot = None
+
+
+def requested():
+    return os.environ.get(SNAPSHOT_ENV, "") not in ("", "0")
+
+
+def active():
+    return _snapshot is not None
+
+
+def take():
+    """Copy the current database into memory and bind ``SessionLocal`` to it."""
+    global _snapshot
+    if _snapshot is not None:
+        return refresh()
+    source_engine = SessionLocal.kw["bind"]
+    memory = sqlite3.connect(":memory:", check_same_thread=False)
+    # One connection, shared by every session: there is no other copy.
+    engine = create_engine("sqlite://", creator=lambda: memory, poolclass=StaticPool)
+    _snapshot = {
+        "connection": memory,
+        "engine": engine,
+        "source": source_engine,
+        "path": source_engine.url.database,
+        "taken_at": None,
+    }
+    _copy()
+    SessionLocal.configure(bind=engine)
+    return _snapshot["taken_at"]
+
+
+def refresh():
+    """Copy the database again; call with no session open. Returns the copy time."""
+    _copy()
+    return _snapshot["taken_at"]
+
+
+def release():
+    """Leave snapshot mode, binding ``SessionLocal`` back to the file."""
+    global _snapshot
+    if _snapshot is None:
+        return
+    SessionLocal.configure(bind=_snapshot["source"])
+    _snapshot["engine"].dispose()
+    _snapshot["connection"].close()
+    _snapshot = None
+
+
+def age():
+    """Seconds since the snapshot was copied."""
+    return time.time() - _snapshot["taken_at"]
+
+
+def taken_at():
+    return _snapshot["taken_at"]
+
+
+def engine():
+    """The engine over the in-memory copy."""
+    return _snapshot["engine"]
+
+
+def _copy():
+    memory = _snapshot["connection"]
+    started = time.time()
+    memory.execute("PRAGMA query_only = OFF")
+    source = sqlite3.connect(
+        f"file:{quote(os.path.abspath(_snapshot['path']))}?mode=ro", uri=True
+    )
+    try:
+        source.backup(memory)
+    finally:
+        source.close()
+    with _snapshot["engine"].begin() as connection:
+        roll_forward(connection)
+    memory.execute("PRAGMA query_only = ON")
+    _snapshot["taken_at"] = started
@@ -0,0 +1,130 @@
+"""
+SQLite storage profiles.
+
+A profile is a set of connection PRAGMAs applied to every new connection.
+Settings are read, lowest precedence first, from the named profile, the
+``[storage]`` section of the INI file named by ``TRACKER_CONFIG``, and
+``TRACKER_*`` environment variables:
+
+    path          TRACKER_DB_PATH         database file
+    profile       TRACKER_STORAGE_PROFILE default | wal | fast
+    journal_mode  TRACKER_JOURNAL_MODE    DELETE | TRUNCATE | PERSIST | WAL | ...
+    synchronous   TRACKER_SYNCHRONOUS     OFF | NORMAL | FULL | EXTRA
+    mmap_size     TRACKER_MMAP_SIZE       bytes
+    cache_size    TRACKER_CACHE_SIZE      pages, or KiB when negative
+    temp_store    TRACKER_TEMP_STORE      DEFAULT | FILE | MEMORY
+
+Foreign key enforcement (``PRAGMA foreign_keys=ON``) is always applied,
+and the ``fingerprint()`` SQL function is always registered.
+"""
+
+import os
+from configparser import ConfigParser
+from sqlalchemy import create_engine, event
+from lib.db import fingerprints
+
+PROFILES = {
+    # SQLite's own defaults: rollback journal with a full fsync per commit.
+    "default": {},
+    # Durable across application crashes, one fsync per checkpoint instead of
+    # per commit, and a larger cache and memory map for scans.
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # For bulk loads and disposable copies: no fsync at all.
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256 * 1024,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+INTEGERS = {"mmap_size", "cache_size"}
+
+# Applied in this order; journal_mode must come before synchronous.
+PRAGMAS = ["journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store"]
+
+
+def _validate(settings):
+    for key in PRAGMAS:
+        value = settings.get(key)
+        if value is None:
+            continue
+        if key in INTEGERS:
+            try:
+                settings[key] = int(value)
+            except ValueError:
+                raise ValueError(f"{key} must be an integer, got {value!r}")
+        else:
+            settings[key] = str(value).upper()
+            if settings[key] not in CHOICES[key]:
+                choices = ", ".join(sorted(CHOICES[key]))
+                raise ValueError(f"{key} must be one of {choices}, got {value!r}")
+    return settings
+
+
+def load_storage_settings(default_path, environ=os.environ):
+    """Resolve the database path and PRAGMA settings for this process."""
+    overrides = {}
+    config_path = environ.get("TRACKER_CONFIG")
+    if config_path:
+        parser = ConfigParser()
+        if not parser.read(config_path):
+            raise ValueError(f"TRACKER_CONFIG file not found: {config_path}")
+        if parser.has_section("storage"):
+            overrides.update(parser["storage"])
+
+    env_names = {"path": "TRACKER_DB_PATH", "profile": "TRACKER_STORAGE_PROFILE"}
+    env_names.update({key: f"TRACKER_{key.upper()}" for key in PRAGMAS})
+    for key, name in env_names.items():
+        if environ.get(name):
+            overrides[key] = environ[name]
+
+    profile = overrides.pop("profile", "default")
+    if profile not in PROFILES:
+        raise ValueError(
+            f"Unknown storage profile {profile!r}; choose from {', '.join(PROFILES)}"
+        )
+    settings = dict(PROFILES[profile], profile=profile)
+    settings.update(overrides)
+    settings["path"] = os.path.abspath(settings.get("path") or default_path)
+    return _validate(settings)
+
+
+def apply_pragmas(dbapi_connection, settings):
+    cursor = dbapi_connection.cursor()
+    try:
+        # Not a tuning knob: deletes rely on ON DELETE CASCADE.
+        cursor.execute("PRAGMA foreign_keys=ON")
+        for key in PRAGMAS:
+            if settings.get(key) is not None:
+                cursor.execute(f"PRAGMA {key}={settings[key]}")
+    finally:
+        cursor.close()
+    fingerprints.register(dbapi_connection)
+
+
+def create_storage_engine(settings, **kwargs):
+    """Engine for ``settings['path']`` that applies the PRAGMAs on connect."""
+    engine = create_engine(f"sqlite:///{settings['path']}", future=True, **kwargs)
+    listen_pragmas(engine, settings)
+    return engine
+
+
+def listen_pragmas(engine, settings):
+    """Apply the PRAGMAs in ``settings`` to each new connection of ``engine``."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, settings)
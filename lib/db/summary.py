@@ -0,0 +1,259 @@
+"""
+Incrementally maintained certification expiry counters.
+
+``expiry_summary`` holds one row per bucket with the number of
+certifications in it, relative to the ``as_of`` date stored alongside:
+
+    expired        expiry_date < as_of
+    expired_today  expiry_date = as_of - 1 (also counted in expired)
+    this_week      as_of <= expiry_date <= as_of + 6
+    soon           as_of + 7 <= expiry_date <= as_of + EXPIRING_SOON_DAYS
+    valid          expiry_date > as_of + EXPIRING_SOON_DAYS
+    no_expiry      expiry_date IS NULL
+
+ORM listeners on Certification adjust the counters inside the flush that
+writes the row; listeners on Course and Institution uncount the
+certifications the database deletes by cascade. Bulk writes that bypass
+the ORM call ``adjust`` or ``adjust_grouped`` themselves.
+``roll_forward`` moves the buckets to a new day by recounting only the
+dates whose bucket changed; ``rebuild`` recounts everything.
+
+Usage:
+    python -m lib.db.summary rebuild
+    python -m lib.db.summary roll-forward     # e.g. daily from cron
+    python -m lib.db.summary show
+"""
+
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from lib.db.models import (
+    EXPIRING_SOON_DAYS,
+    SessionLocal,
+    init_db,
+    Institution,
+    Course,
+    Certification,
+    ExpirySummary,
+)
+
+BUCKETS = ["expired", "expired_today", "this_week", "soon", "valid", "no_expiry"]
+WEEK_DAYS = 7
+
+summary = ExpirySummary.__table__
+
+
+def buckets_for(expiry_date, as_of):
+    """The buckets a certification expiring on ``expiry_date`` counts in."""
+    if expiry_date is None:
+        return ["no_expiry"]
+    if expiry_date < as_of:
+        if expiry_date == as_of - timedelta(days=1):
+            return ["expired", "expired_today"]
+        return ["expired"]
+    days = (expiry_date - as_of).days
+    if days < WEEK_DAYS:
+        return ["this_week"]
+    if days <= EXPIRING_SOON_DAYS:
+        return ["soon"]
+    return ["valid"]
+
+
+def _state(connection):
+    """The stored ``as_of`` date, or None if the summary was never built."""
+    return connection.execute(select(summary.c.as_of).limit(1)).scalar()
+
+
+def _apply(connection, deltas):
+    for bucket, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(summary)
+                .where(summary.c.bucket == bucket)
+                .values(count=summary.c.count + delta)
+            )
+
+
+def adjust(connection, added=(), removed=()):
+    """
+    Count ``added`` and uncount ``removed`` expiry dates. Use this from
+    bulk writes that bypass the ORM listeners.
+    """
+    as_of = _state(connection)
+    if as_of is None:
+        return
+    deltas = Counter()
+    for expiry_date in added:
+        deltas.update(buckets_for(expiry_date, as_of))
+    for expiry_date in removed:
+        deltas.subtract(buckets_for(expiry_date, as_of))
+    _apply(connection, deltas)
+
+
+def adjust_grouped(connection, added=(), removed=()):
+    """Like ``adjust``, for (expiry date, count) pairs from ``expiry_histogram``."""
+    as_of = _state(connection)
+    if as_of is None:
+        return
+    deltas = Counter()
+    for pairs, sign in [(added, 1), (removed, -1)]:
+        for expiry_date, count in pairs:
+            for bucket in buckets_for(expiry_date, as_of):
+                deltas[bucket] += sign * count
+    _apply(connection, deltas)
+
+
+def expiry_histogram(*criteria, expiry=Certification.expiry_date):
+    """
+    (expiry_date, count) for each distinct date among the certifications
+    matching ``criteria``. Pass the SET expression of a bulk update as
+    ``expiry`` to count the dates the update will write.
+    """
+    return select(expiry, func.count()).where(*criteria).group_by(expiry)
+
+
+def count_buckets(connection, today=None):
+    """Count every bucket from the certifications table, without storing it."""
+    today = today or date.today()
+    expiry = Certification.expiry_date
+    week_end = today + timedelta(days=WEEK_DAYS - 1)
+    soon_end = today + timedelta(days=EXPIRING_SOON_DAYS)
+    yesterday = today - timedelta(days=1)
+    row = connection.execute(
+        select(
+            func.count().filter(expiry < today).label("expired"),
+            func.count().filter(expiry == yesterday).label("expired_today"),
+            func.count().filter(expiry.between(today, week_end)).label("this_week"),
+            func.count()
+            .filter(expiry.between(week_end + timedelta(days=1), soon_end))
+            .label("soon"),
+            func.count().filter(expiry > soon_end).label("valid"),
+            func.count().filter(expiry.is_(None)).label("no_expiry"),
+        ).select_from(Certification)
+    ).one()
+    return dict(row._mapping)
+
+
+def rebuild(connection, today=None):
+    """Recount every bucket from the certifications table."""
+    today = today or date.today()
+    counts = count_buckets(connection, today)
+    connection.execute(delete(summary))
+    connection.execute(
+        insert(summary),
+        [
+            {"bucket": bucket, "count": counts[bucket], "as_of": today}
+            for bucket in BUCKETS
+        ],
+    )
+
+
+def roll_forward(connection, today=None):
+    """
+    Move the buckets from the stored ``as_of`` to ``today``. Only
+    certifications expiring between the old ``as_of`` (less a day) and the
+    new soon horizon can change bucket, so only that indexed date range is
+    recounted.
+    """
+    today = today or date.today()
+    as_of = _state(connection)
+    if as_of is None or as_of > today:
+        rebuild(connection, today)
+        return
+    if as_of == today:
+        return
+
+    rows = connection.execute(
+        expiry_histogram(
+            Certification.expiry_date.between(
+                as_of - timedelta(days=1),
+                today + timedelta(days=EXPIRING_SOON_DAYS),
+            )
+        )
+    )
+    deltas = Counter()
+    for expiry_date, count in rows:
+        for bucket in buckets_for(expiry_date, as_of):
+            deltas[bucket] -= count
+        for bucket in buckets_for(expiry_date, today):
+            deltas[bucket] += count
+    _apply(connection, deltas)
+    connection.execute(update(summary).values(as_of=today))
+
+
+def read_summary(session, today=None):
+    """Bucket counts for ``today``, rolling the summary forward if needed."""
+    today = today or date.today()
+    connection = session.connection()
+    if _state(connection) != today:
+        if connection.exec_driver_sql("PRAGMA query_only").scalar():
+            # A read-only snapshot cannot store the roll forward.
+            return count_buckets(connection, today)
+        roll_forward(connection, today)
+        session.commit()
+        connection = session.connection()
+    counts = dict.fromkeys(BUCKETS, 0)
+    counts.update(connection.execute(select(summary.c.bucket, summary.c.count)).all())
+    return counts
+
+
+# ---------------------- ORM listeners ----------------------
+@event.listens_for(Certification, "after_insert")
+def _certification_inserted(mapper, connection, target):
+    adjust(connection, added=[target.expiry_date])
+
+
+@event.listens_for(Certification, "after_delete")
+def _certification_deleted(mapper, connection, target):
+    adjust(connection, removed=[target.expiry_date])
+
+
+@event.listens_for(Certification, "after_update")
+def _certification_updated(mapper, connection, target):
+    history = inspect(target).attrs.expiry_date.history
+    if not history.has_changes():
+        return
+    removed = history.deleted or [None]
+    adjust(connection, added=[target.expiry_date], removed=removed[:1])
+
+
+@event.listens_for(Course, "before_delete")
+def _course_deleting(mapper, connection, target):
+    # ON DELETE CASCADE removes the certifications without the ORM seeing them.
+    rows = connection.execute(expiry_histogram(Certification.course_id == target.id))
+    adjust_grouped(connection, removed=rows.all())
+
+
+@event.listens_for(Institution, "before_delete")
+def _institution_deleting(mapper, connection, target):
+    courses = select(Course.id).where(Course.institution_id == target.id)
+    rows = connection.execute(expiry_histogram(Certification.course_id.in_(courses)))
+    adjust_grouped(connection, removed=rows.all())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "show"
+    if command not in {"rebuild", "roll-forward", "show"}:
+        print("Usage: python -m lib.db.summary [rebuild|roll-forward|show]")
+        return 2
+
+    init_db()
+    session = SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild(session.connection())
+            session.commit()
+        elif command == "roll-forward":
+            roll_forward(session.connection())
+            session.commit()
+        for bucket, count in read_summary(session).items():
+            print(f"{bucket:<15}{count:>12}")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Find and resolve duplicate institutions, courses and certifications.
+
+Rows are duplicates when they share a fingerprint (``lib.db.fingerprints``)
+within the same scope: institutions by name, courses by name within an
+institution, certifications by title and level within a course. Each kind
+is found with one GROUP BY over its (scope, fingerprint) index, a single
+pass over the index however many rows there are.
+
+Without ``--apply`` the groups are only counted, and listed with
+``--show``. With ``--apply`` every group keeps its lowest id and the
+others are resolved, one transaction per kind:
+
+    merge    (default) the duplicates' courses or certifications move to
+             the kept row, and a kept certification takes its group's
+             latest issue and expiry dates. The duplicates are then deleted.
+    delete   certifications only: the duplicates are deleted.
+
+Kinds are resolved in the order institutions, courses, certifications, so
+courses that become duplicates when their institutions merge are merged in
+the same run.
+
+Usage:
+    python -m lib.dedupe
+    python -m lib.dedupe --kind certifications --show
+    python -m lib.dedupe --apply
+    python -m lib.dedupe --kind certifications --delete --apply
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from sqlalchemy import and_, bindparam, delete, func, select, update
+from lib.db import fingerprints
+from lib.db.models import SessionLocal, init_db, Institution, Course, Certification
+from lib.db.summary import adjust_grouped
+
+# kind: (model, scope column, child foreign key moved to the kept row)
+KINDS = {
+    "institutions": (Institution, None, Course.institution_id),
+    "courses": (Course, Course.institution_id, Certification.course_id),
+    "certifications": (Certification, Certification.course_id, None),
+}
+
+
+def _keys(kind):
+    model, scope, _ = KINDS[kind]
+    return [model.fingerprint] if scope is None else [scope, model.fingerprint]
+
+
+def duplicate_groups(kind):
+    """One row per group of duplicates: its keys, kept id and row count."""
+    model = KINDS[kind][0]
+    keys = _keys(kind)
+    return (
+        select(*keys, func.min(model.id).label("keep"), func.count().label("rows"))
+        .where(model.fingerprint.is_not(None))
+        .group_by(*keys)
+        .having(func.count() > 1)
+    )
+
+
+def count_duplicates(session, kind):
+    """(groups, rows that would be removed) for ``kind``."""
+    groups = duplicate_groups(kind).subquery()
+    return session.execute(
+        select(func.count(), func.coalesce(func.sum(groups.c.rows - 1), 0))
+    ).one()
+
+
+def group_members(kind, *columns):
+    """
+    (id, kept id, *columns) for every row in a group of duplicates, ordered
+    by group and id.
+    """
+    model = KINDS[kind][0]
+    groups = duplicate_groups(kind).subquery()
+    on = and_(*(key == groups.c[key.key] for key in _keys(kind)))
+    return (
+        select(model.id, groups.c.keep, *columns)
+        .join(groups, on)
+        .order_by(groups.c.keep, model.id)
+    )
+
+
+def duplicate_ids(kind):
+    """The ids of every row in a group of duplicates except the kept one."""
+    members = group_members(kind).subquery()
+    return select(members.c.id).where(members.c.id != members.c.keep)
+
+
+def labels(kind):
+    """The columns a kind's fingerprint is computed from."""
+    model = KINDS[kind][0]
+    return [getattr(model, name) for name in fingerprints.SOURCES[model.__tablename__]]
+
+
+def matching_certification(session, course_id, title, level):
+    """Id of a certification in the course with the same title and level."""
+    return session.scalar(
+        select(Certification.id)
+        .where(
+            Certification.course_id == course_id,
+            Certification.fingerprint == fingerprints.fingerprint(title, level),
+        )
+        .limit(1)
+    )
+
+
+def resolve(session, kind, action="merge"):
+    """
+    Merge or delete the duplicates of ``kind`` in the session's transaction.
+    Returns the number of rows removed.
+    """
+    model, _, child = KINDS[kind]
+    dated = kind == "certifications"
+    extra = [Certification.issue_date, Certification.expiry_date] if dated else []
+    members = session.execute(group_members(kind, *extra)).all()
+    removed = [
+        {"dup_id": row.id, "keep_id": row.keep} for row in members if row.id != row.keep
+    ]
+    if not removed:
+        return 0
+    connection = session.connection()
+    if child is not None:
+        table = child.table
+        connection.execute(
+            update(table)
+            .where(child == bindparam("dup_id"))
+            .values({child.key: bindparam("keep_id")}),
+            removed,
+        )
+    if dated:
+        _fold_dates(connection, members, merge=action == "merge")
+    connection.execute(delete(model).where(model.id.in_(duplicate_ids(kind))))
+    return len(removed)
+
+
+def _fold_dates(connection, members, merge):
+    """
+    Uncount the duplicates' expiry dates and, when merging, give each kept
+    certification its group's latest issue and expiry dates.
+    """
+    uncounted, counted, kept, latest = Counter(), Counter(), {}, {}
+    for row in members:
+        if row.id == row.keep:
+            kept[row.id] = latest[row.id] = (row.issue_date, row.expiry_date)
+            continue
+        uncounted[row.expiry_date] += 1
+        if merge:
+            latest[row.keep] = tuple(
+                max(filter(None, pair), default=None)
+                for pair in zip(latest[row.keep], (row.issue_date, row.expiry_date))
+            )
+    changes = []
+    for keep_id, (issue, expiry) in sorted(latest.items()):
+        if (issue, expiry) != kept[keep_id]:
+            changes.append({"keep_id": keep_id, "issue": issue, "expiry": expiry})
+            uncounted[kept[keep_id][1]] += 1
+            counted[expiry] += 1
+    table = Certification.__table__
+    if changes:
+        connection.execute(
+            update(table)
+            .where(table.c.id == bindparam("keep_id"))
+            .values(issue_date=bindparam("issue"), expiry_date=bindparam("expiry")),
+            changes,
+        )
+    # Core writes bypass the ORM listeners, so move the counts here.
+    adjust_grouped(connection, added=counted.items(), removed=uncounted.items())
+
+
+def show(session, kind, out=None):
+    """Print each group of duplicates, the kept row first."""
+    out = out or sys.stdout
+    for row in session.execute(group_members(kind, *labels(kind))):
+        label = " / ".join(str(value) for value in row[2:] if value is not None)
+        marker = "keep" if row.id == row.keep else "   -"
+        print(f"  {marker} #{row.id} {label}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find and merge or delete duplicate records."
+    )
+    parser.add_argument("--kind", choices=list(KINDS), help="default: all, in order")
+    parser.add_argument("--show", action="store_true", help="list each group")
+    parser.add_argument(
+        "--delete",
+        dest="action",
+        action="store_const",
+        const="delete",
+        default="merge",
+        help="delete duplicate certifications instead of merging them",
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="make the change (default: dry run)"
+    )
+    args = parser.parse_args(argv)
+    if args.action == "delete" and args.kind != "certifications":
+        parser.error("--delete only applies to --kind certifications")
+    kinds = [args.kind] if args.kind else list(KINDS)
+
+    init_db()
+    session = SessionLocal()
+    try:
+        # Rows written by other tools may have no fingerprint yet.
+        fingerprints.fill(session.connection())
+        session.commit()
+        for kind in kinds:
+            start = time.perf_counter()
+            groups, duplicates = count_duplicates(session, kind)
+            elapsed = time.perf_counter() - start
+            print(f"{kind}: {groups} groups, {duplicates} duplicates ({elapsed:.3f}s)")
+            if args.show:
+                show(session, kind)
+            if args.apply and duplicates:
+                start = time.perf_counter()
+                removed = resolve(session, kind, args.action)
+                session.commit()
+                elapsed = time.perf_counter() - start
+                verb = "Merged" if args.action == "merge" else "Deleted"
+                print(f"{verb} {removed} {kind} in {elapsed:.3f}s")
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    if not args.apply:
+        print("Dry run: nothing changed. Re-run with --apply to resolve them.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Streaming export of certifications, joined with course and institution
+names, to CSV or JSONL.
+
+Usage:
+    python -m lib.exporter -o certifications.csv
+    python -m lib.exporter --format jsonl --status expired
+    python -m lib.exporter -o soon.jsonl --institution "Moringa School" --expires-within 30
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date, timedelta
+from lib.db.models import SessionLocal, init_db
+from lib.db.queries import STATUS_SLUGS, certifications_export
+from lib.db.records import CertificationRecord, stream_records
+from lib.helpers import date_arg
+
+FIELDS = [
+    "id",
+    "title",
+    "level",
+    "issue_date",
+    "expiry_date",
+    "status",
+    "course_name",
+    "institution_name",
+]
+
+
+def export_rows(session, stmt, today=None):
+    """Yield export dicts for ``stmt``, fetching rows in chunks."""
+    for record in stream_records(session, stmt, CertificationRecord, today):
+        values = record._asdict()
+        yield {field: values[field] for field in FIELDS}
+
+
+def write_csv(records, out, fields=FIELDS):
+    writer = csv.DictWriter(out, fieldnames=fields)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def write_jsonl(records, out, fields=None):
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export certifications.")
+    parser.add_argument("-o", "--output", default="-", help="file path, - for stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--status", choices=sorted(STATUS_SLUGS))
+    parser.add_argument("--institution", help="institution name")
+    parser.add_argument("--expires-from", type=date_arg, metavar="YYYY-MM-DD")
+    parser.add_argument("--expires-to", type=date_arg, metavar="YYYY-MM-DD")
+    parser.add_argument(
+        "--expires-within",
+        type=int,
+        metavar="DAYS",
+        help="expired or expiring within DAYS from today",
+    )
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output.endswith((".jsonl", ".ndjson")) else "csv"
+    today = date.today()
+    expires_to = args.expires_to
+    if args.expires_within is not None:
+        horizon = today + timedelta(days=args.expires_within)
+        expires_to = min(expires_to, horizon) if expires_to else horizon
+
+    stmt = certifications_export(
+        status=STATUS_SLUGS.get(args.status),
+        institution=args.institution,
+        expires_from=args.expires_from,
+        expires_to=expires_to,
+        today=today,
+    )
+    write = write_jsonl if fmt == "jsonl" else write_csv
+
+    init_db()
+    session = SessionLocal()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        count = write(export_rows(session, stmt, today), out)
+    finally:
+        session.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {count} certifications.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
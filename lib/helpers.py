@@ -1,10 +1,41 @@
+import argparse
+import functools
 import os
+import sys
 from datetime import datetime
+from lib import profiling
+
+# Cursor home, clear the screen and the scrollback.
+CLEAR_SEQUENCE = "\033[H\033[2J\033[3J"
 
 
 def clear_screen():
-    """Clear terminal screen cross-platform."""
-    os.system("cls" if os.name == "nt" else "clear")
+    """
+    Clear the terminal with ANSI escapes. Does nothing if not a terminal,
+    or while profiling, so the summaries stay visible.
+    """
+    if not sys.stdout.isatty() or profiling.enabled():
+        return
+    if os.name == "nt":
+        _enable_windows_escapes()
+    sys.stdout.write(CLEAR_SEQUENCE)
+    sys.stdout.flush()
+
+
+@functools.cache
+def _enable_windows_escapes():
+    """
+    Turn on escape sequence handling in the Windows 10+ console, which
+    starts with it off, through the console API instead of a subprocess.
+    """
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        kernel32.SetConsoleMode(handle, mode.value | 0x0004)
 
 
 def prompt_int(prompt_text, allow_blank=False):
@@ -45,8 +76,30 @@ def confirm(prompt_text="Are you sure? [y/N]: "):
     return input(prompt_text).strip().lower() in {"y", "yes"}
 
 
-def divider(title=None):
+def divider_text(title=None):
     if title:
-        print(f"---- {title} ".ljust(60, "-"))
-    else:
-        print("-" * 60)
+        return f"---- {title} ".ljust(60, "-")
+    return "-" * 60
+
+
+def divider(title=None):
+    print(divider_text(title))
+
+
+def date_arg(value):
+    """argparse type for a YYYY-MM-DD date."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def format_age(seconds):
+    """``seconds`` as a short age: 45s, 12 min or 3 h 5 min."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60} min"
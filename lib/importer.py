@@ -0,0 +1,266 @@
+"""
+Bulk import of institutions, courses and certifications from CSV or JSONL.
+
+Each record names its institution and course by natural key (institution
+name, course name within that institution); missing ones are created on
+first use. A record without a ``title`` only ensures its institution and
+course exist. Recognised fields:
+
+    institution, institution_location, institution_year, institution_type,
+    course, course_description, course_duration,
+    title, level, issue_date, expiry_date
+
+Usage:
+    python -m lib.importer data.csv
+    python -m lib.importer data.jsonl --batch-size 10000
+    cat data.jsonl | python -m lib.importer - --format jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert, select
+from lib.db import summary
+from lib.db.models import SessionLocal, init_db, Institution, Course, Certification
+
+# Certification rows inserted per transaction.
+BATCH_SIZE = 5000
+
+
+def read_records(stream, fmt):
+    """Yield (line number, record dict) pairs from a CSV or JSONL stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ValueError("expected a JSON object")
+            continue
+        yield line_no, record
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _date(record, field):
+    value = _text(record, field)
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"{field} must be YYYY-MM-DD, got {value!r}")
+
+
+def _year(record):
+    value = _text(record, "institution_year")
+    if value is None:
+        return None
+    if not value.isdigit():
+        raise ValueError(f"institution_year must be a whole number, got {value!r}")
+    return int(value)
+
+
+def parse_record(record):
+    """Validate a raw record; returns (institution, course, certification) dicts."""
+    inst_name = _text(record, "institution")
+    course_name = _text(record, "course")
+    if not inst_name:
+        raise ValueError("institution is required")
+    if not course_name:
+        raise ValueError("course is required")
+
+    inst = {
+        "name": inst_name,
+        "location": _text(record, "institution_location"),
+        "year": _year(record),
+        "type": _text(record, "institution_type"),
+    }
+    course = {
+        "name": course_name,
+        "description": _text(record, "course_description"),
+        "duration": _text(record, "course_duration"),
+    }
+    title = _text(record, "title")
+    cert = None
+    if title:
+        cert = {
+            "title": title,
+            "level": _text(record, "level"),
+            "issue_date": _date(record, "issue_date"),
+            "expiry_date": _date(record, "expiry_date"),
+        }
+    elif _text(record, "level") or _text(record, "expiry_date"):
+        raise ValueError("title is required for a certification")
+    return inst, course, cert
+
+
+class _KeyResolver:
+    """Resolve natural keys to ids, creating rows on first use."""
+
+    def __init__(self, session):
+        self.session = session
+        self.institutions = {}
+        self.courses = {}
+
+    def institution_id(self, inst, stats):
+        name = inst["name"]
+        if name not in self.institutions:
+            inst_id = self.session.execute(
+                select(Institution.id)
+                .where(Institution.name == name)
+                .order_by(Institution.id)
+                .limit(1)
+            ).scalar()
+            if inst_id is None:
+                inst_id = self.session.execute(
+                    insert(Institution).values(**inst).returning(Institution.id)
+                ).scalar_one()
+                stats["institutions"] += 1
+            self.institutions[name] = inst_id
+        return self.institutions[name]
+
+    def course_id(self, inst_id, course, stats):
+        key = (inst_id, course["name"])
+        if key not in self.courses:
+            course_id = self.session.execute(
+                select(Course.id)
+                .where(Course.institution_id == inst_id, Course.name == course["name"])
+                .order_by(Course.id)
+                .limit(1)
+            ).scalar()
+            if course_id is None:
+                course_id = self.session.execute(
+                    insert(Course)
+                    .values(institution_id=inst_id, **course)
+                    .returning(Course.id)
+                ).scalar_one()
+                stats["courses"] += 1
+            self.courses[key] = course_id
+        return self.courses[key]
+
+
+def import_records(session, records, batch_size=BATCH_SIZE, report=None):
+    """
+    Insert ``records`` (as produced by ``read_records``) in batched
+    transactions. Invalid rows are passed to ``report(line_no, message)``
+    and skipped. A batch of certifications that fails to insert is rolled
+    back and its rows counted as errors; the institutions and courses
+    created before it are committed first, so they are kept. Only the
+    current batch is held in memory; the natural key caches grow with the
+    number of distinct institutions and courses. Returns a Counter of rows
+    read, rows inserted and errors.
+    """
+    report = report or (lambda line_no, message: None)
+    stats = Counter()
+    resolver = _KeyResolver(session)
+    batch = []
+    first_line = None
+
+    def flush():
+        if not batch:
+            return
+        # A failed batch must not take the resolver's rows with it: they are
+        # already counted and cached, and title-less rows have no other trace.
+        session.commit()
+        try:
+            session.execute(insert(Certification), batch)
+            # Bulk inserts skip the ORM listeners, so count the batch here.
+            summary.adjust(
+                session.connection(), added=[cert["expiry_date"] for cert in batch]
+            )
+            session.commit()
+            stats["certifications"] += len(batch)
+        except Exception as e:
+            session.rollback()
+            stats["errors"] += len(batch)
+            report(first_line, f"batch of {len(batch)} rows rolled back: {e}")
+        batch.clear()
+
+    for line_no, record in records:
+        stats["rows"] += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            inst, course, cert = parse_record(record)
+            inst_id = resolver.institution_id(inst, stats)
+            course_id = resolver.course_id(inst_id, course, stats)
+        except Exception as e:
+            stats["errors"] += 1
+            report(line_no, str(e))
+            continue
+        if cert is None:
+            continue
+        if not batch:
+            first_line = line_no
+        cert["course_id"] = course_id
+        batch.append(cert)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    session.commit()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk import institutions, courses and certifications."
+    )
+    parser.add_argument("path", help="CSV or JSONL file, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv"
+
+    def report(line_no, message):
+        print(f"line {line_no}: {message}", file=sys.stderr)
+
+    init_db()
+    session = SessionLocal()
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="")
+    start = time.perf_counter()
+    try:
+        stats = import_records(
+            session, read_records(stream, fmt), args.batch_size, report
+        )
+    finally:
+        session.close()
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Read {stats['rows']} rows in {elapsed:.2f}s "
+        f"({stats['rows'] / elapsed if elapsed else 0:,.0f} rows/s)"
+    )
+    print(
+        f"Inserted {stats['certifications']} certifications, "
+        f"{stats['courses']} courses, {stats['institutions']} institutions"
+    )
+    print(f"Errors: {stats['errors']}")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Per-action SQL instrumentation from SQLAlchemy's cursor execute events.
+
+While profiling is on, every statement any engine runs is counted, timed
+and grouped by its normalized text under the menu action (or scripted
+command) that ran it. A summary goes to stderr when the action finishes,
+so repeated statements, the mark of an N+1 pattern, show up in their
+count column. Screens are not cleared while profiling, so summaries stay
+in the scrollback.
+
+Statement times cover the cursor execute call, which in SQLite runs the
+query up to its first row. Fetching the remaining rows of a streamed
+report counts only in the action's total time.
+
+Turn it on with ``python main.py --profile`` or ``TRACKER_PROFILE=1``.
+``--profile-trace PATH`` or ``TRACKER_PROFILE_TRACE=PATH`` also appends
+each action to PATH as one JSON object per line, with every statement
+execution in order, for offline analysis.
+
+main.py imports this module before anything else, so SQLAlchemy and json
+are only imported once they are needed.
+"""
+
+import functools
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PROFILE_ENV = "TRACKER_PROFILE"
+TRACE_ENV = "TRACKER_PROFILE_TRACE"
+
+# Statements listed in each summary, slowest total first.
+SUMMARY_STATEMENTS = 8
+
+# Characters of each statement shown in a summary.
+STATEMENT_WIDTH = 90
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+# Set by enable(); TRACKER_PROFILE_TRACE is used otherwise.
+_trace_path = None
+
+# The action being profiled: its name, start times and executions.
+_action = None
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(statement):
+    """
+    ``statement`` with literals replaced by ``?``, IN lists collapsed to
+    ``(?...)`` and whitespace collapsed, so executions that differ only in
+    their values group together.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?...)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def enable(trace_path=None):
+    """Turn profiling on; ``trace_path`` overrides TRACKER_PROFILE_TRACE."""
+    global _trace_path
+    os.environ[PROFILE_ENV] = "1"
+    _trace_path = trace_path
+
+
+def take_flags(argv):
+    """
+    Remove ``--profile`` and ``--profile-trace PATH`` from ``argv``,
+    enabling profiling if either is given. Returns the other arguments.
+    """
+    rest, trace_path, found = [], None, False
+    args = iter(argv)
+    for arg in args:
+        if arg == "--profile":
+            found = True
+        elif arg == "--profile-trace":
+            found, trace_path = True, next(args, None)
+        elif arg.startswith("--profile-trace="):
+            found, trace_path = True, arg.partition("=")[2]
+        else:
+            rest.append(arg)
+    if found:
+        enable(trace_path)
+    return rest
+
+
+def _listen():
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    # Listening on the Engine class covers every engine, including the
+    # benchmarks' and the async engine's.
+    if not event.contains(Engine, "before_cursor_execute", _before_execute):
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    end = time.perf_counter()
+    start = conn.info["profile_start"].pop()
+    if _action is not None:
+        _action["executions"].append((statement, start, end - start))
+
+
+def profiled(fn):
+    """Profile each call of ``fn`` as an action named after it, when enabled."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with profile(fn.__name__):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def profile(name):
+    """
+    ``action(name)`` when profiling is enabled and no action is running;
+    otherwise a context that does nothing. Actions started inside another
+    are counted in the outer one.
+    """
+    if _action is not None or not enabled():
+        return nullcontext()
+    return action(name)
+
+
+@contextmanager
+def action(name):
+    """Profile the statements run inside the block as the action ``name``."""
+    global _action
+    _listen()
+    _action = {
+        "name": name,
+        "started": datetime.now(),
+        "start": time.perf_counter(),
+        "executions": [],
+    }
+    try:
+        yield
+    finally:
+        profile, _action = _action, None
+        seconds = time.perf_counter() - profile["start"]
+        statements = group_statements(profile["executions"])
+        print_summary(name, seconds, statements)
+        trace_path = _trace_path or os.environ.get(TRACE_ENV)
+        if trace_path:
+            write_trace(trace_path, profile, seconds, statements)
+
+
+def group_statements(executions):
+    """
+    {normalized statement: {"count", "seconds", "max_seconds"}} in the order
+    the statements first ran.
+    """
+    grouped = {}
+    for statement, _, seconds in executions:
+        stats = grouped.setdefault(
+            normalize(statement), {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+    return grouped
+
+
+def print_summary(name, seconds, statements, out=None):
+    out = out or sys.stderr
+    queries = sum(stats["count"] for stats in statements.values())
+    sql_seconds = sum(stats["seconds"] for stats in statements.values())
+    print(
+        f"\n-- profile: {name}: {queries} queries ({len(statements)} distinct), "
+        f"{sql_seconds * 1000:.1f} ms executing, {seconds * 1000:.1f} ms total",
+        file=out,
+    )
+    if not statements:
+        return
+    print(f"   {'count':>6}{'total ms':>10}{'max ms':>9}  statement", file=out)
+    slowest = sorted(statements.items(), key=lambda item: -item[1]["seconds"])
+    for statement, stats in slowest[:SUMMARY_STATEMENTS]:
+        if len(statement) > STATEMENT_WIDTH:
+            statement = statement[: STATEMENT_WIDTH - 3] + "..."
+        print(
+            f"   {stats['count']:>6}{stats['seconds'] * 1000:>10.2f}"
+            f"{stats['max_seconds'] * 1000:>9.2f}  {statement}",
+            file=out,
+        )
+    if len(slowest) > SUMMARY_STATEMENTS:
+        print(f"   ... {len(slowest) - SUMMARY_STATEMENTS} more", file=out)
+    out.flush()
+
+
+def write_trace(path, profile, seconds, statements):
+    """Append one action to the JSON lines trace at ``path``."""
+    import json
+
+    index = {statement: i for i, statement in enumerate(statements)}
+    record = {
+        "action": profile["name"],
+        "started": profile["started"].isoformat(),
+        "seconds": seconds,
+        "queries": len(profile["executions"]),
+        "statements": [
+            dict(stats, statement=statement) for statement, stats in statements.items()
+        ],
+        # (statement index, offset from the action start, duration), in order.
+        "executions": [
+            [index[normalize(statement)], start - profile["start"], duration]
+            for statement, start, duration in profile["executions"]
+        ],
+    }
+    with open(path, "a") as trace:
+        trace.write(json.dumps(record) + "\n")
@@ -0,0 +1,127 @@
+"""
+Buffered rendering for the list and report screens.
+
+Screens are built as iterables of lines. ``table`` formats rows into
+aligned columns, ``write`` sends lines to the terminal in large chunks
+instead of one ``print`` per row, and ``show`` routes output that is taller
+than the terminal through a pager (``$PAGER``, default ``less -FRX``; set
+``PAGER=`` to turn it off).
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from collections import namedtuple
+from itertools import chain, islice
+
+# Characters buffered before each write to the terminal.
+CHUNK_SIZE = 64 * 1024
+
+# Column widths are taken from the header and this many leading rows; longer
+# values further down are cut to fit.
+SAMPLE_ROWS = 200
+
+# Widest any column but the last may grow.
+MAX_WIDTH = 36
+
+DEFAULT_PAGER = "less -FRX"
+
+# ``value`` maps a row to the cell; ``align`` is a format alignment (< or >).
+Column = namedtuple("Column", "header value align", defaults=["<"])
+
+
+def _cells(columns, row):
+    return [
+        "-" if value is None else value for value in (c.value(row) for c in columns)
+    ]
+
+
+def table(columns, rows, sample=SAMPLE_ROWS, max_width=MAX_WIDTH):
+    """
+    Yield a header line and one aligned line per row. Values wider than
+    their column are cut; the last column is neither padded nor cut.
+    """
+    rows = iter(rows)
+    head = [_cells(columns, row) for row in islice(rows, sample)]
+    widths = [
+        min(max_width, max([len(col.header)] + [len(str(cells[i])) for cells in head]))
+        for i, col in enumerate(columns[:-1])
+    ]
+    # One format string per table; !s keeps dates from reading the width
+    # spec as a strftime pattern.
+    fmt = "  ".join(
+        [f"{{!s:{col.align}{w}.{w}}}" for col, w in zip(columns, widths)] + ["{!s}"]
+    )
+
+    yield fmt.format(*[col.header for col in columns]).rstrip()
+    for cells in head:
+        yield fmt.format(*cells).rstrip()
+    for row in rows:
+        yield fmt.format(*_cells(columns, row)).rstrip()
+
+
+def write(lines, out=None):
+    """Write ``lines`` in chunks of about CHUNK_SIZE; returns the line count."""
+    out = out or sys.stdout
+    buffer = []
+    size = count = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line) + 1
+        count += 1
+        if size >= CHUNK_SIZE:
+            out.write("\n".join(buffer) + "\n")
+            buffer.clear()
+            size = 0
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+    out.flush()
+    return count
+
+
+def pager_command():
+    """The pager to run as an argument list, or None if there is none."""
+    command = shlex.split(os.environ.get("PAGER", DEFAULT_PAGER))
+    if not command or shutil.which(command[0]) is None:
+        return None
+    return command
+
+
+def show(lines):
+    """
+    Write ``lines`` to stdout. On a terminal, once they are more than fit
+    on the screen, the rest goes through the pager; leaving the pager early
+    stops reading ``lines``.
+    """
+    out = sys.stdout
+    lines = iter(lines)
+    if not out.isatty():
+        return write(lines, out)
+    height = shutil.get_terminal_size().lines - 1
+    first = list(islice(lines, height + 1))
+    command = pager_command()
+    if len(first) <= height or command is None:
+        return write(chain(first, lines), out)
+
+    out.flush()
+    pager = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        text=True,
+        encoding=out.encoding or "utf-8",
+        errors="replace",
+    )
+    count = 0
+    try:
+        count = write(chain(first, lines), pager.stdin)
+    except BrokenPipeError:
+        # The user quit the pager before the end.
+        pass
+    try:
+        pager.stdin.close()
+    except BrokenPipeError:
+        pass
+    pager.wait()
+    return count
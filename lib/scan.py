@@ -0,0 +1,213 @@
+"""
+Parallel expiry sweep for very large databases.
+
+The certification id range is split into chunks that a process pool
+scans independently. Each worker opens its own read-only connection,
+reads its chunk by primary key, computes statuses, formats the rows and
+writes them, sorted by (expiry date, id), to a temporary file. The parent
+then merges the chunk files in expiry order, copying the rows as they
+are. Status evaluation and formatting, the CPU-bound part, therefore
+spread across cores.
+
+Rows and formats match ``lib.exporter``; the selection matches the expiry
+report (expired, or expiring within ``--days``).
+
+Usage:
+    python -m lib.scan -o expiring.csv
+    python -m lib.scan --days 90 --workers 8 --format jsonl > sweep.jsonl
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from operator import attrgetter, itemgetter
+from urllib.parse import quote
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import NullPool
+from lib.db.constants import EXPIRING_SOON_DAYS
+from lib.db.models import DB_PATH, Certification
+from lib.db.queries import certifications_listing
+from lib.db.records import CertificationRecord, to_records
+from lib.exporter import FIELDS
+
+# Certification ids per chunk; several chunks per worker even out the load.
+CHUNK_IDS = 100_000
+
+# Chunk files hold one line per row: a fixed-width "expiry<TAB>id<TAB>" key,
+# so plain string order is (expiry date, id) order, then a marker and the
+# formatted output row. RAW rows are copied as they are. A CSV row with a
+# line break in a field is stored as a JSON string instead (ESCAPED), so
+# it stays on one line through the merge; JSONL rows never need it.
+KEY_WIDTH = len("YYYY-MM-DD\t000000000000\t")
+RAW, ESCAPED = "-", "+"
+
+# A CertificationRecord's values in export column order.
+_export_values = itemgetter(*(CertificationRecord._fields.index(f) for f in FIELDS))
+
+# One encoder for every row; json.dumps with options builds a new one per call.
+_encode = json.JSONEncoder(default=str).encode
+
+# The read-only engine of a worker process.
+_engine = None
+
+
+def read_only_engine(path):
+    """Engine that opens ``path`` read-only, one connection per use."""
+    return create_engine(
+        f"sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&uri=true",
+        poolclass=NullPool,
+    )
+
+
+def _init_worker(path):
+    global _engine
+    _engine = read_only_engine(path)
+
+
+def chunk_select(first_id, end_id, horizon):
+    """Expiring certifications with ``first_id <= id < end_id``, unordered."""
+    stmt, _, _ = certifications_listing()
+    return stmt.where(
+        Certification.id >= first_id,
+        Certification.id < end_id,
+        Certification.expiry_date.is_not(None),
+        Certification.expiry_date <= horizon,
+    )
+
+
+def chunks(first_id, last_id, size=CHUNK_IDS):
+    """[first, end) id ranges covering ``first_id`` to ``last_id``."""
+    return [
+        (start, min(start + size, last_id + 1))
+        for start in range(first_id, last_id + 1, size)
+    ]
+
+
+def scan_chunk(task):
+    """Write one chunk's rows to ``path`` in (expiry, id) order; returns the count."""
+    first_id, end_id, horizon, today, fmt, path = task
+    with _engine.connect() as connection:
+        rows = connection.execute(chunk_select(first_id, end_id, horizon)).all()
+    records = list(to_records(rows, CertificationRecord, today))
+    records.sort(key=attrgetter("expiry_date", "id"))
+
+    lines = []
+    writer = csv.writer(_LineSink(lines), lineterminator="\n")
+    with open(path, "w") as out:
+        for record in records:
+            key = f"{record.expiry_date.isoformat()}\t{record.id:012d}\t"
+            values = _export_values(record)
+            if fmt == "jsonl":
+                out.write(key + RAW + _encode(dict(zip(FIELDS, values))) + "\n")
+                continue
+            writer.writerow(values)
+            line = lines.pop()
+            if "\n" in line[:-1] or "\r" in line:
+                out.write(key + ESCAPED + json.dumps(line) + "\n")
+            else:
+                out.write(key + RAW + line)
+    return len(records)
+
+
+class _LineSink:
+    """File-like target that collects each line csv.writer writes."""
+
+    def __init__(self, lines):
+        self.write = lines.append
+
+
+def scan(
+    path,
+    out,
+    days=EXPIRING_SOON_DAYS,
+    today=None,
+    fmt="csv",
+    workers=None,
+    chunk_size=CHUNK_IDS,
+):
+    """
+    Write the expiry sweep of database ``path`` to ``out``, soonest expiry
+    first, using ``workers`` processes (default: one per CPU) over chunks of
+    ``chunk_size`` ids. Returns the number of rows written.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=days)
+    workers = workers or os.cpu_count() or 1
+    engine = read_only_engine(path)
+    with engine.connect() as connection:
+        first_id, last_id = connection.execute(
+            select(func.min(Certification.id), func.max(Certification.id))
+        ).one()
+    engine.dispose()
+
+    if fmt == "csv":
+        csv.writer(out, lineterminator="\n").writerow(FIELDS)
+    if first_id is None:
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks = [
+            (start, end, horizon, today, fmt, os.path.join(tmp, f"{start}.part"))
+            for start, end in chunks(first_id, last_id, chunk_size)
+        ]
+        if workers == 1:
+            _init_worker(path)
+            counts = [scan_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(path,)
+            ) as pool:
+                counts = list(pool.map(scan_chunk, tasks))
+
+        parts = [open(task[-1]) for task in tasks]
+        try:
+            # Formatting happened in the workers; this serial part only copies.
+            for line in heapq.merge(*parts):
+                if line[KEY_WIDTH] == RAW:
+                    out.write(line[KEY_WIDTH + 1 :])
+                else:
+                    out.write(json.loads(line[KEY_WIDTH + 1 :]))
+        finally:
+            for part in parts:
+                part.close()
+    return sum(counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel expiry sweep.")
+    parser.add_argument("-o", "--output", default="-", help="file path, - for stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--days", type=int, default=EXPIRING_SOON_DAYS)
+    parser.add_argument(
+        "--workers", type=int, help="worker processes (default: one per CPU)"
+    )
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    start = time.perf_counter()
+    try:
+        count = scan(args.db, out, args.days, fmt=args.format, workers=args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"Scanned {count} certifications in {elapsed:.2f}s "
+        f"({count / elapsed if elapsed else 0:,.0f} rows/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,16 @@
-from lib.cli import run_cli
+import sys
+from lib.profiling import take_flags
 
 if __name__ == "__main__":
-    run_cli()
+    argv = take_flags(sys.argv[1:])
+    if argv and argv != ["--snapshot"]:
+        if "--snapshot" in argv:
+            sys.exit("--snapshot is for the interactive menus.")
+        from lib.commands import main
+
+        sys.exit(main(argv))
+
+    from lib.cli import run_cli
+    from lib.db import snapshot
+
+    run_cli(use_snapshot=bool(argv) or snapshot.requested())